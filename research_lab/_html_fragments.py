@@ -0,0 +1,227 @@
+"""
+Shared HTML fragments for the MASTER_TRADING_TABLE generators
+
+Holds the stat formatters and the "top rows" block (scenarios A/B/C built
+from row1..row5) used by both update_html_detailed.py and update_html_full.py.
+"""
+from functools import lru_cache
+from sys import intern
+
+# CSS class names repeated on every generated row, interned so all templates
+# and f-strings share a single string object per name.
+PROB_HIGH = intern("prob-high")
+PROB_MED = intern("prob-medium")
+PROB_LOW = intern("prob-low")
+DATE_EX = intern("date-example")
+SCENARIO_HEADER = intern("scenario-header")
+SUB_SCENARIO = intern("sub-scenario")
+
+# Helper Functions
+# Formatted strings are memoized on the (hashable) stat values, so identical
+# stats dicts shared between rows/variants are only formatted once.
+@lru_cache(maxsize=None)
+def _vix_html(min_, max_, median, avg):
+    return f"<strong>min:</strong> {min_}<br><strong>max:</strong> {max_}<br><strong>median:</strong> {median}<br><strong>avg:</strong> {avg}"
+
+@lru_cache(maxsize=None)
+def _timing_html(min_, min_date, max_, max_date, median, median_date, avg):
+    return (f"<strong>min:</strong> {int(min_)} min on {min_date}<br>"
+            f"<strong>max:</strong> {int(max_)} min on {max_date}<br>"
+            f"<strong>median:</strong> {int(median)} min on {median_date}<br>"
+            f"<strong>avg:</strong> {int(avg)} min")
+
+@lru_cache(maxsize=None)
+def _dates_html(dates):
+    return '<br>'.join(dates)
+
+def format_vix(vix_stats):
+    if vix_stats is None: return "N/A"
+    return _vix_html(vix_stats['min'], vix_stats['max'], vix_stats['median'], vix_stats['avg'])
+
+def format_timing(timing_stats, na="N/A"):
+    if timing_stats is None: return na
+    return _timing_html(timing_stats['min'], timing_stats['min_date'],
+                        timing_stats['max'], timing_stats['max_date'],
+                        timing_stats['median'], timing_stats['median_date'],
+                        timing_stats['avg'])
+
+def format_dates(dates_list):
+    return _dates_html(tuple(dates_list))
+
+def precompute_html(node):
+    """
+    Return a copy of the stats tree with '_dates_html'/'_vix_html' attached to every
+    entry that has dates or vix (recursing into breakdown/buckets). The loaded stats
+    are memoized by load_stats, so they are never modified in place.
+    """
+    out = {k: precompute_html(v) if isinstance(v, dict) else v for k, v in node.items()}
+    if 'dates' in node or 'vix' in node:
+        out['_dates_html'] = format_dates(node.get('dates', []))
+        out['_vix_html'] = format_vix(node.get('vix'))
+    return out
+
+# --------------------------------------------------------------------------------
+# PAGE HEAD
+# --------------------------------------------------------------------------------
+
+# Stylesheet shared by both table variants; each variant appends its own rules.
+_CSS = """        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 20px; background-color: #f5f5f5; }
+        .grid-container { background-color: white; border-radius: 8px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); overflow: hidden; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { padding: 12px 15px; text-align: left; border-bottom: 1px solid #ddd; border-right: 1px solid #eee; font-size: 14px; vertical-align: top; }
+        th { background-color: #4a86e8; color: white; font-weight: 600; text-transform: uppercase; font-size: 12px; letter-spacing: 0.5px; }
+        tr:last-child td { border-bottom: none; }
+        .scenario-header td { background-color: #f8f9fa; font-weight: 600; color: #2c3e50; border-top: 2px solid #e9ecef; }
+        .prob-high { background-color: #d4edda; color: #155724; font-weight: bold; }
+        .prob-medium { background-color: #fff3cd; color: #856404; font-weight: bold; }
+        .prob-low { background-color: #f8d7da; color: #721c24; font-weight: bold; }
+        .date-example { font-family: 'Consolas', monospace; font-size: 11px; color: #666; white-space: nowrap; }
+"""
+
+HTML_START_TMPL = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <title>Trading Strategy Probability Grid</title>
+    <style>
+{css}    </style>
+</head>
+<body>
+"""
+
+def html_start(extra_css=""):
+    """Return the page head with the shared stylesheet plus `extra_css` rules."""
+    return HTML_START_TMPL.format(css=_CSS + extra_css)
+
+# --------------------------------------------------------------------------------
+# TOP ROWS (Scenarios A/B/C)
+# --------------------------------------------------------------------------------
+
+# Stats keys making up each scenario group
+HIGH_KEYS = ('row1', 'row2_direct', 'row2_retraced')
+LOW_KEYS = ('row3', 'row4_direct', 'row4_retraced')
+ALL_KEYS = HIGH_KEYS + LOW_KEYS + ('row5',)
+
+# Row Templates
+SUB_SCENARIO_ROW = f"""<tr class="{SUB_SCENARIO}">
+                    <td>{{label}}</td>
+                    <td class="{PROB_LOW}"><strong>{{prob}}%</strong><br>{{count}}</td>
+                    <td>{{timing}}</td>
+                    <td>{{vix}}</td>
+                    <td class="{DATE_EX}">{{dates}}</td>
+                </tr>"""
+
+# Per-variant differences of the top rows.
+# Stats for Parent Cells (Time 1st Order) are not stored in the JSON, so the
+# values from the previous HTML generation are kept as static placeholders.
+_STYLES = {
+    'detailed': {
+        'count': "({})",
+        'timing_na': "N/A",
+        'stayed_timing': "-",
+        'row1_timing': "<strong>min:</strong> 0 min on 2015-02-19<br><strong>max:</strong> 370 min on 2015-06-16<br><strong>median:</strong> 20 min on 2016-06-27<br><strong>avg:</strong> 87 min",
+        'row3_timing': "<strong>min:</strong> 0 min on 2015-01-29<br><strong>max:</strong> 590 min on 2017-10-19<br><strong>median:</strong> 20 min on 2015-05-06<br><strong>avg:</strong> 76 min",
+        'open_cells': """<td rowspan="7" style="border-right: 2px solid #ddd;">
+                        <strong>Market Open Inside</strong><br>
+                        <h3>Market Open Inside Analysis (First 5-min Candle Close Inside Prev Range)</h3>
+                        <p><strong>Condition:</strong> The first 5-minute candle of the day <strong>closes</strong> inside the previous day's high/low range.</p>
+                    </td>
+                    <td rowspan="7" style="border-right: 2px solid #ddd;"><strong>{global_prob}%</strong><br>({total_days})</td>""",
+        'inside_label': "stayed within prev day range (neither high nor low touched)",
+        'inside_summary': "Avg Range: {avg_pct_range}%",
+    },
+    'full': {
+        'count': "<strong>({} days)</strong>",
+        'timing_na': "N/A (stayed within)",
+        'stayed_timing': "N/A (stayed within)",
+        'row1_timing': "<strong>min:</strong> 0 on 2015-02-19<br><strong>max:</strong> 370 on 2015-06-16<br><strong>median:</strong> 20 on 2016-06-27<br><strong>avg:</strong> 87 min",
+        'row3_timing': "<strong>min:</strong> 0 on 2015-01-29<br><strong>max:</strong> 590 on 2017-10-19 ⚠️<br><strong>(valid max: 370)</strong><br><strong>median:</strong> 20 on 2015-05-06<br><strong>avg:</strong> 76 min",
+        'open_cells': """<td rowspan="7" style="border-right: 2px solid #ddd;">
+                        <strong>{total_days} Days Analyzed</strong><br>
+                        <span style="font-size:11px; color:#666">
+                        Inside Open Strategy<br>
+                        (Excludes Gap Up/Down)
+                        </span>
+                    </td>
+                    <td rowspan="7" style="border-right: 2px solid #ddd;"><strong>100%</strong></td>""",
+        'inside_label': "stayed within prev day range<br>(neither high nor low touched)",
+        'inside_summary': """
+                        Avg % range: {avg_pct_range}%<br>
+                        Gap from high: {avg_gap_high}%<br>
+                        Gap from low: {avg_gap_low}%
+                    """,
+    },
+}
+
+def build_top_rows(stats, *, style='detailed'):
+    """Return the scenario A/B/C rows of the Market Open Inside table."""
+    s = _STYLES[style]
+    count = s['count'].format
+
+    def sub_scenario_row(label, row):
+        return SUB_SCENARIO_ROW.format_map({
+            'label': label,
+            'prob': row['prob'],
+            'count': count(row['count']),
+            'timing': format_timing(row['timing'], s['timing_na']),
+            'vix': row['_vix_html'],
+            'dates': row['_dates_html'],
+        })
+
+    counts = {k: stats[k]['count'] for k in ALL_KEYS}
+    total_days = sum(counts.values())
+    total_high_group = sum(counts[k] for k in HIGH_KEYS)
+    total_high_prob = round(total_high_group / total_days * 100, 1) if total_days > 0 else 0
+    total_low_group = sum(counts[k] for k in LOW_KEYS)
+    total_low_prob = round(total_low_group / total_days * 100, 1) if total_days > 0 else 0
+    prob_r5 = round(counts['row5'] / total_days * 100, 1) if total_days > 0 else 0
+
+    # Global Prob
+    global_prob = stats.get('global_stats', {}).get('inside_prob', 0)
+
+    open_cells = s['open_cells'].format(global_prob=global_prob, total_days=total_days)
+    inside_summary = s['inside_summary'].format_map(stats['row5'])
+
+    rows = f"""
+                <!-- SCENARIO A -->
+                <tr class="{SCENARIO_HEADER}">
+                    {open_cells}
+
+                    <td rowspan="3">touched prev day high; before touching prev day low</td>
+                    <td rowspan="3" class="{PROB_MED}"><strong>{total_high_prob}%</strong><br>{count(total_high_group)}</td>
+                    <td rowspan="3">{s['row1_timing']}</td>
+
+                    <td>stayed within 10% above prev high (did not go ≥10% of range above)</td>
+                    <td class="{PROB_HIGH}"><strong>{stats['row1']['prob']}%</strong><br>{count(stats['row1']['count'])}</td>
+                    <td>{s['stayed_timing']}</td>
+                    <td>{stats['row1']['_vix_html']}</td>
+                    <td class="{DATE_EX}">{stats['row1']['_dates_html']}</td>
+                </tr>
+                {sub_scenario_row("goes ≥10% above prev high <strong>BEFORE</strong> touching mid of prev day range", stats['row2_direct'])}
+                {sub_scenario_row("goes ≥10% above prev high <strong>AFTER</strong> touching mid of prev day range", stats['row2_retraced'])}
+
+                <!-- SCENARIO B -->
+                <tr class="{SCENARIO_HEADER}">
+                    <td rowspan="3">touched prev day low; before touching prev day high</td>
+                    <td rowspan="3" class="{PROB_MED}"><strong>{total_low_prob}%</strong><br>{count(total_low_group)}</td>
+                    <td rowspan="3">{s['row3_timing']}</td>
+
+                    <td>stayed within 10% below prev low (did not go ≥10% of range below)</td>
+                    <td class="{PROB_HIGH}"><strong>{stats['row3']['prob']}%</strong><br>{count(stats['row3']['count'])}</td>
+                    <td>{s['stayed_timing']}</td>
+                    <td>{stats['row3']['_vix_html']}</td>
+                    <td class="{DATE_EX}">{stats['row3']['_dates_html']}</td>
+                </tr>
+                {sub_scenario_row("goes ≥10% below prev low <strong>BEFORE</strong> touching mid of prev day range", stats['row4_direct'])}
+                {sub_scenario_row("goes ≥10% below prev low <strong>AFTER</strong> touching mid of prev day range", stats['row4_retraced'])}
+
+                <!-- SCENARIO C -->
+                <tr class="{SCENARIO_HEADER}">
+                    <td colspan="3">{s['inside_label']}</td>
+                    <td colspan="2" class="{PROB_LOW}"><strong>{prob_r5}%</strong><br>{count(stats['row5']['count'])}</td>
+                    <td colspan="2">{inside_summary}</td>
+                    <td>{stats['row5']['_vix_html']}</td>
+                    <td class="{DATE_EX}">{stats['row5']['_dates_html']}</td>
+                </tr>
+"""
+    return rows
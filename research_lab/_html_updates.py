@@ -0,0 +1,68 @@
+"""
+Shared read/replace/write helper for the MASTER_TRADING_TABLE updater scripts
+
+Each updater (update_html_with_corrected_data.py, update_vix_timing.py,
+update_html_split.py) describes its changes as (old literal, new text, once)
+edits and/or an html -> html transform. apply_updates() reads the HTML once,
+applies each updater's edits as its own pass, in order, then the transforms,
+and writes it back once.
+"""
+import mmap
+import os
+import re
+
+HTML_PATH = r'C:\Users\atuls\Startup\TradeAlgo\research_lab\results\probability_grid\MASTER_TRADING_TABLE.html'
+
+def apply_edits(html, edits):
+    """Apply all (old, new, once) edits in one pass; once=True only replaces the first match."""
+    subs = {}
+    once = set()
+    for old, new, first_only in edits:
+        # Cheap substring gate: on reruns most markers are already gone, so
+        # they are dropped before building (and scanning with) the regex
+        if old in subs or old not in html:
+            continue
+        subs[old] = new
+        if first_only:
+            once.add(old)
+    if not subs:
+        return html
+
+    # Longest literals first so a key never loses to one of its own prefixes
+    pattern = re.compile('|'.join(re.escape(k) for k in sorted(subs, key=len, reverse=True)))
+    done = set()
+
+    def _sub(m):
+        key = m.group(0)
+        if key in done:
+            return key
+        if key in once:
+            done.add(key)
+        return subs[key]
+
+    return pattern.sub(_sub, html)
+
+def read_html(html_path):
+    """Decode the file straight from a read-only memory map (no intermediate bytes copy)."""
+    with open(html_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ''  # empty files cannot be mapped
+        # The map is closed before the caller rewrites the file (required on Windows)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return str(mm, 'utf-8')
+
+def apply_updates(html_path, edit_groups, transforms=()):
+    """
+    Read html_path, apply each list of edits in `edit_groups` then each transform, in order, and write it back.
+
+    Every group is a separate apply_edits() pass: a later updater's markers may
+    only exist once an earlier one's edits have been applied.
+    """
+    html = read_html(html_path)
+    for edits in edit_groups:
+        html = apply_edits(html, edits)
+    for transform in transforms:
+        html = transform(html)
+
+    with open(html_path, 'wb') as f:
+        f.write(html.encode('utf-8'))
@@ -0,0 +1,23 @@
+"""
+Shared loader for final_corrected_stats.json (and the other probability_grid stats files)
+
+The HTML generators all read the same stats file; loading it through here
+means each file is read and parsed once per process.
+"""
+from functools import lru_cache
+
+try:
+    import orjson as _json
+    _loads = _json.loads
+except ImportError:
+    import json
+    _loads = json.loads
+
+STATS_PATH = r'C:\Users\atuls\Startup\TradeAlgo\research_lab\results\probability_grid\final_corrected_stats.json'
+
+# One entry per stats file: update_html_all.py loads several of them in one process
+@lru_cache(maxsize=None)
+def load_stats(path=STATS_PATH):
+    # orjson only accepts bytes, so always read in binary mode
+    with open(path, 'rb') as f:
+        return _loads(f.read())
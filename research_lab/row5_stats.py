@@ -21,7 +21,9 @@ df_5min = df.resample('5min').agg({
 }).dropna()
 
 df_5min['date'] = df_5min.index.date
-df_5min['minutes_since_915'] = df_5min.index.hour * 60 + df_5min.index.minute - (9*60 + 15)
+ts_ns = df_5min.index.as_unit('ns').asi8
+minutes_of_day = (ts_ns // 60_000_000_000) % 1440
+df_5min['minutes_since_915'] = (minutes_of_day - (9*60 + 15)).astype('int16')
 df_5min.reset_index(inplace=True)
 
 # Daily aggregation
@@ -42,10 +44,9 @@ daily['day_range'] = daily['day_high'] - daily['day_low']
 # Load VIX
 vix = pd.read_csv(r'C:\Users\atuls\Startup\TradeAlgo\kaggle_data\archive\INDIA VIX_minute.csv')
 vix['datetime'] = pd.to_datetime(vix['date'])
-vix['date'] = vix['datetime'].dt.date
-vix_daily = vix.groupby('date').agg({'close': 'last'}).reset_index()
-vix_daily = vix_daily.rename(columns={'close': 'vix'})
-daily = daily.merge(vix_daily, on='date', how='left')
+vix_daily = vix.set_index('datetime')['close'].resample('1D').last().dropna().rename('vix').reset_index()
+vix_daily['date'] = vix_daily['datetime'].dt.date
+daily = daily.merge(vix_daily[['date', 'vix']], on='date', how='left')
 
 # Opening classification
 def classify_open(row):
@@ -77,11 +78,11 @@ stayed_inside['pct_range'] = (stayed_inside['day_range'] / stayed_inside['prev_r
 stayed_inside['gap_from_high'] = ((stayed_inside['prev_high'] - stayed_inside['day_high']) / stayed_inside['prev_range']) * 100
 stayed_inside['gap_from_low'] = ((stayed_inside['day_low'] - stayed_inside['prev_low']) / stayed_inside['prev_range']) * 100
 
-print(f"\nAvg % range of day compared to prev day range: {stayed_inside['pct_range'].mean():.1f}%")
-print(f"Avg % gap from prev day high: {stayed_inside['gap_from_high'].mean():.1f}%")
-print(f"Avg % gap from prev day low: {stayed_inside['gap_from_low'].mean():.1f}%")
+print(f"\nAvg % range of day compared to prev day range: {np.nanmean(stayed_inside['pct_range'].values):.1f}%")
+print(f"Avg % gap from prev day high: {np.nanmean(stayed_inside['gap_from_high'].values):.1f}%")
+print(f"Avg % gap from prev day low: {np.nanmean(stayed_inside['gap_from_low'].values):.1f}%")
 
-print(f"\nMedian VIX: {stayed_inside['vix'].median():.2f}")
+print(f"\nMedian VIX: {np.nanmedian(stayed_inside['vix'].values):.2f}")
 
 recent = stayed_inside.sort_values('date', ascending=False).head(5)
 print(f"\nRecent examples:")
@@ -22,7 +22,9 @@ df_5min = df.resample('5min').agg({
 }).dropna()
 
 df_5min['date'] = df_5min.index.date
-df_5min['minutes_since_915'] = df_5min.index.hour * 60 + df_5min.index.minute - (9*60 + 15)
+ts_ns = df_5min.index.as_unit('ns').asi8
+minutes_of_day = (ts_ns // 60_000_000_000) % 1440
+df_5min['minutes_since_915'] = (minutes_of_day - (9*60 + 15)).astype('int16')
 df_5min.reset_index(inplace=True)
 
 # Daily aggregation
@@ -43,10 +45,9 @@ daily['day_range'] = daily['day_high'] - daily['day_low']
 # Load VIX
 vix = pd.read_csv(r'C:\Users\atuls\Startup\TradeAlgo\kaggle_data\archive\INDIA VIX_minute.csv')
 vix['datetime'] = pd.to_datetime(vix['date'])
-vix['date'] = vix['datetime'].dt.date
-vix_daily = vix.groupby('date').agg({'close': 'last'}).reset_index()
-vix_daily = vix_daily.rename(columns={'close': 'vix'})
-daily = daily.merge(vix_daily, on='date', how='left')
+vix_daily = vix.set_index('datetime')['close'].resample('1D').last().dropna().rename('vix').reset_index()
+vix_daily['date'] = vix_daily['datetime'].dt.date
+daily = daily.merge(vix_daily[['date', 'vix']], on='date', how='left')
 
 # Timing
 for idx, day in daily.iterrows():
@@ -111,34 +112,34 @@ output = {
     "row1_stayed_within_10pct_above": {
         "count": len(high_stayed_within_10pct),
         "probability": round(len(high_stayed_within_10pct) / len(touched_high_first) * 100, 1),
-        "vix": round(high_stayed_within_10pct['vix'].median(), 2),
+        "vix": round(np.nanmedian(high_stayed_within_10pct['vix'].values), 2),
         "dates": [str(d) for d in high_stayed_within_10pct.sort_values('date', ascending=False).head(5)['date'].tolist()]
     },
     "row2_went_10pct_above": {
         "count": len(high_went_10pct_above),
         "probability": round(len(high_went_10pct_above) / len(touched_high_first) * 100, 1),
-        "vix": round(high_went_10pct_above['vix'].median(), 2),
+        "vix": round(np.nanmedian(high_went_10pct_above['vix'].values), 2),
         "dates": [str(d) for d in high_went_10pct_above.sort_values('date', ascending=False).head(5)['date'].tolist()]
     },
     "row3_stayed_within_10pct_below": {
         "count": len(low_stayed_within_10pct),
         "probability": round(len(low_stayed_within_10pct) / len(touched_low_first) * 100, 1),
-        "vix": round(low_stayed_within_10pct['vix'].median(), 2),
+        "vix": round(np.nanmedian(low_stayed_within_10pct['vix'].values), 2),
         "dates": [str(d) for d in low_stayed_within_10pct.sort_values('date', ascending=False).head(5)['date'].tolist()]
     },
     "row4_went_10pct_below": {
         "count": len(low_went_10pct_below),
         "probability": round(len(low_went_10pct_below) / len(touched_low_first) * 100, 1),
-        "vix": round(low_went_10pct_below['vix'].median(), 2),
+        "vix": round(np.nanmedian(low_went_10pct_below['vix'].values), 2),
         "dates": [str(d) for d in low_went_10pct_below.sort_values('date', ascending=False).head(5)['date'].tolist()]
     },
     "row5_stayed_inside": {
         "count": len(stayed_inside),
         "probability": round(len(stayed_inside) / len(inside_days) * 100, 1),
-        "vix": round(stayed_inside['vix'].median(), 2),
-        "avg_pct_range": round(stayed_inside['pct_range'].mean(), 1),
-        "avg_gap_from_high": round(stayed_inside['gap_from_high'].mean(), 1),
-        "avg_gap_from_low": round(stayed_inside['gap_from_low'].mean(), 1),
+        "vix": round(np.nanmedian(stayed_inside['vix'].values), 2),
+        "avg_pct_range": round(np.nanmean(stayed_inside['pct_range'].values), 1),
+        "avg_gap_from_high": round(np.nanmean(stayed_inside['gap_from_high'].values), 1),
+        "avg_gap_from_low": round(np.nanmean(stayed_inside['gap_from_low'].values), 1),
         "dates": [str(d) for d in stayed_inside.sort_values('date', ascending=False).head(5)['date'].tolist()]
     }
 }
@@ -11,28 +11,29 @@ df_5min = df.resample('5min').agg({
 
 df_5min['date'] = df_5min.index.date
 df_5min['time'] = df_5min.index.time
-df_5min['minutes_since_915'] = df_5min.index.hour * 60 + df_5min.index.minute - (9*60 + 15)
+ts_ns = df_5min.index.as_unit('ns').asi8
+minutes_of_day = (ts_ns // 60_000_000_000) % 1440
+df_5min['minutes_since_915'] = (minutes_of_day - (9*60 + 15)).astype('int16')
 df_5min.reset_index(inplace=True)
 
-# Get first candle
-first_candles = df_5min[df_5min['minutes_since_915'] == 0].copy()
+# Get first candle, indexed by date for sorted lookups
+first_candles = df_5min[df_5min['minutes_since_915'] == 0].set_index('date').sort_index()
 
 # Check Jan 24
 jan24 = date(2025, 1, 24)
-jan24_first = first_candles[first_candles['date'] == jan24]
+jan24_first = first_candles.loc[jan24:jan24]
 
 print("First candle for Jan 24 (minutes_since_915 == 0):")
-print(jan24_first[['date', 'time', 'minutes_since_915', 'open', 'close']])
+print(jan24_first[['time', 'minutes_since_915', 'open', 'close']])
 
 # Check prev day
 jan23 = date(2025, 1, 23)
-daily = df_5min.groupby('date').agg({'high': 'max', 'low': 'min'}).reset_index()
-jan23_row = daily[daily['date'] == jan23]
-prev_high = jan23_row['high'].values[0]
+daily = df_5min.groupby('date').agg({'high': 'max', 'low': 'min'})
+prev_high = daily.loc[jan23, 'high']
 
 print(f"\nPrev high: {prev_high:.2f}")
 if len(jan24_first) > 0:
-    fc_close = jan24_first['close'].values[0]
+    fc_close = jan24_first['close'].iloc[0]
     print(f"First candle close: {fc_close:.2f}")
     
     if fc_close > prev_high:
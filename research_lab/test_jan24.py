@@ -11,6 +11,7 @@ df_5min = df.resample('5min', closed='left', label='left').agg({
 
 df_5min['date'] = df_5min['datetime'].dt.date
 df_5min['time'] = df_5min['datetime'].dt.time
+candles_by_date = df_5min.set_index('date').sort_index()
 
 # Get first candle per day
 first_candle = df_5min.groupby('date').first()
@@ -20,7 +21,7 @@ jan24 = date(2025, 1, 24)
 jan23 = date(2025, 1, 23)
 
 # All Jan 24 candles
-jan24_all = df_5min[df_5min['date'] == jan24]
+jan24_all = candles_by_date.loc[jan24:jan24]
 print("First 3 candles on Jan 24:")
 print(jan24_all[['time', 'open', 'high', 'low', 'close']].head(3).to_string())
 
@@ -30,7 +31,7 @@ print(f"Time: {first_candle.loc[jan24, 'time']}")
 print(f"Close: {first_candle.loc[jan24, 'close']:.2f}")
 
 # Prev high
-jan23_all = df_5min[df_5min['date'] == jan23]
+jan23_all = candles_by_date.loc[jan23:jan23]
 prev_high = jan23_all['high'].max()
 print(f"\nJan 23 prev_high: {prev_high:.2f}")
 
@@ -0,0 +1,386 @@
+"""
+Generate the MASTER_TRADING_TABLE HTML artifacts
+
+Loads final_corrected_stats.json once and writes both variants in a single
+process:
+  - detailed: Market Open Inside + Closing Analysis with exploded buckets
+  - full: Market Open Inside with the close above/below summary rows
+
+Usage: python update_html.py [detailed|full] [--force]   (default: both)
+"""
+import argparse
+import gzip
+import hashlib
+import os
+import shutil
+
+import numpy as np
+
+import _html_fragments
+from _html_fragments import DATE_EX, SCENARIO_HEADER, build_top_rows, html_start, precompute_html
+from _stats_loader import STATS_PATH, load_stats
+
+OUTPUT_PATHS = {
+    'detailed': r'C:\Users\atuls\Startup\TradeAlgo\research_lab\results\probability_grid\MASTER_TRADING_TABLE.html',
+    'full': r'C:\Users\atuls\Startup\TradeAlgo\research_lab\results\probability_grid\MASTER_TRADING_TABLE_FULL.html',
+}
+
+# --------------------------------------------------------------------------------
+# DETAILED VARIANT
+# --------------------------------------------------------------------------------
+
+# Row Templates (reused for every time group / bucket)
+TIME_GROUP_CELLS = '<td rowspan="4">{time_label}</td><td rowspan="4"><strong>{group_prob}%</strong><br>({group_count})</td><td rowspan="4">-</td>'
+BUCKET_CELLS = f'<td>{{bucket_label}}</td><td><strong>{{b_prob}}%</strong><br>({{b_count}})</td><td>-</td><td>{{vix}}</td><td class="{DATE_EX}">{{dates}}</td>'
+OPEN_DESC_TMPL = """
+    <div class="open-breakdown">
+    Above: {above}<br>
+    Inside: {inside}<br>
+    Below: {below}
+    </div>
+    """
+
+DETAILED_HTML_START = html_start("""        .sub-scenario td { padding-left: 15px; font-size: 13px; color: #555; }
+        .open-breakdown { font-size: 11px; color: #666; font-weight: normal; margin-top: 5px; }
+""").encode('utf-8')
+
+# Bottom Rows (Detailed)
+# Closing scenarios rendered in Table 2: (stats key, title, direction)
+CLOSING_SCENARIOS = (
+    ('close_above_detailed', 'Close: Top of Prev Day High', 'ABOVE'),
+    ('close_below_detailed', 'Close: Below Prev Day Low', 'BELOW'),
+)
+BUCKET_KEYS = ("direct_ext", "no_ext", "touched_opp_mid", "touched_opp_low")
+
+# Verbose Outcome Labels (same order as BUCKET_KEYS)
+# Note: For Close Above, touching High is consistent. For Close Below, touching Low is consistent.
+BUCKET_LABELS = {
+    "ABOVE": (
+        "Went ABOVE at least 10% (of prev day range) over previous day HIGH",
+        "Did NOT go ABOVE at least 10% (of prev day range) over previous day HIGH",
+        "Went BELOW prev day HIGH to touch prev day range MID",
+        "Went BELOW prev day HIGH to touch prev day range LOW",
+    ),
+    "BELOW": (
+        "Went BELOW at least 10% (of prev day range) over previous day LOW",
+        "Did NOT go BELOW at least 10% (of prev day range) over previous day LOW",
+        "Went ABOVE prev day LOW to touch prev day range MID",
+        "Went ABOVE prev day LOW to touch prev day range HIGH",
+    ),
+}
+TIME_GROUPS = (("early", "Touched"), ("late", "Did NOT touch"))
+
+SCENARIO_CELLS = (f'<td rowspan="8" class="{SCENARIO_HEADER}"><strong>{{title}}</strong>{{open_desc}}</td>'
+                  f'<td rowspan="8" class="{SCENARIO_HEADER}"><strong>{{prob}}%</strong><br>({{count}})</td>')
+
+def build_scenarios(stats):
+    """Flatten the closing stats into scenario -> time group -> bucket dicts ready for rendering."""
+    scenarios = []
+    for key_name, title, direction_label in CLOSING_SCENARIOS:
+        data = stats[key_name]
+        
+        # OPEN BREAKDOWN Parsing
+        open_stats = data.get('open_breakdown', {})
+        open_desc = OPEN_DESC_TMPL.format_map({
+            'above': open_stats.get('above', 0),
+            'inside': open_stats.get('inside', 0),
+            'below': open_stats.get('below', 0),
+        })
+        
+        target_level = "High" if direction_label == "ABOVE" else "Low"
+        bucket_labels = BUCKET_LABELS[direction_label]
+        
+        time_groups = []
+        for time_key, prefix in TIME_GROUPS:
+            group_data = data['breakdown'][time_key]
+            
+            # Pull all bucket probabilities/counts out in one pass.
+            # JSON: "prob": round(count / total * 100, 1) where total = Scenario Total (Close Above Count).
+            buckets = group_data['buckets']
+            probs = np.fromiter((buckets[k]['prob'] for k in BUCKET_KEYS), dtype=np.float64, count=len(BUCKET_KEYS))
+            counts = np.fromiter((buckets[k]['count'] for k in BUCKET_KEYS), dtype=np.int64, count=len(BUCKET_KEYS))
+            
+            time_groups.append({
+                'time_label': f"{prefix} Prev Day {target_level} within 10 AM",
+                'group_prob': group_data['prob'],
+                'group_count': group_data['count'],
+                'buckets': [
+                    {
+                        'bucket_label': label,
+                        'b_prob': b_prob,
+                        'b_count': b_count,
+                        # Buckets may have neither vix nor dates: rendered as N/A / no dates
+                        'vix': buckets[b_key].get('_vix_html', "N/A"),
+                        'dates': buckets[b_key].get('_dates_html', ""),
+                    }
+                    for b_key, label, b_prob, b_count in zip(BUCKET_KEYS, bucket_labels, probs.tolist(), counts.tolist())
+                ],
+            })
+        
+        scenarios.append({
+            'title': title,
+            'open_desc': open_desc,
+            'prob': data['prob'],
+            'count': data['count'],
+            'time_groups': time_groups,
+        })
+    return scenarios
+
+def render_closing_rows(scenarios, write):
+    """Emit 8 rows per scenario: scenario cells (rowspan 8), time group cells (rowspan 4), bucket cells."""
+    for scenario in scenarios:
+        scenario_cells = SCENARIO_CELLS.format_map(scenario)
+        for time_group in scenario['time_groups']:
+            group_cells = TIME_GROUP_CELLS.format_map(time_group)
+            for bucket in time_group['buckets']:
+                # Timing Outcome column is a placeholder ('-') in BUCKET_CELLS.
+                write(f"<tr>{scenario_cells}{group_cells}{BUCKET_CELLS.format_map(bucket)}</tr>")
+                scenario_cells = group_cells = ""
+
+# Table Shells (rows are streamed in between start and end)
+TABLE1_START = b"""
+    <div class="grid-container" style="margin-bottom: 40px;">
+        <h2 style="padding: 15px 15px 0; margin:0; color:#2c3e50;">1. Market Open Inside Analysis</h2>
+        <table>
+            <thead>
+                <tr>
+                    <th style="width: 15%">Category / Open</th>
+                    <th style="width: 6%">% Probability<br>(Total)</th>
+                    <th style="width: 15%">1st Event / Time of Day</th>
+                    <th style="width: 6%">% Probability<br>(Sub-Group)</th>
+                    <th style="width: 10%">Time Info</th>
+                    <th style="width: 15%">Detailed Outcome<br><span style="font-size:10px; font-weight:normal;">(Based on 5-min Close)</span></th>
+                    <th style="width: 6%">% Probability<br>(Outcome)</th>
+                    <th style="width: 10%">Timing</th>
+                    <th style="width: 8%">VIX</th>
+                    <th style="width: 9%">Example Dates</th>
+                </tr>
+            </thead>
+            <tbody>
+                """
+TABLE1_END = b"""
+            </tbody>
+        </table>
+    </div>
+"""
+
+TABLE2_START = b"""
+    <div class="grid-container">
+        <h2 style="padding: 15px 15px 0; margin:0; color:#2c3e50;">2. Closing Analysis</h2>
+        <table>
+            <thead>
+                <tr>
+                    <th style="width: 15%">Closing Scenario</th>
+                    <th style="width: 6%">% Probability<br>(Total)</th>
+                    <th style="width: 15%">Breakout Time</th>
+                    <th style="width: 6%">% Probability<br>(Time Group)</th>
+                    <th style="width: 10%">Time Info</th>
+                    <th style="width: 15%">Detailed Outcome<br><span style="font-size:10px; font-weight:normal;">(Based on 5-min Close)</span></th>
+                    <th style="width: 6%">% Probability<br>(Outcome)</th>
+                    <th style="width: 10%">Timing</th>
+                    <th style="width: 8%">VIX</th>
+                    <th style="width: 9%">Example Dates</th>
+                </tr>
+            </thead>
+            <tbody>
+                """
+TABLE2_END = b"""
+            </tbody>
+        </table>
+    </div>
+"""
+
+DETAILED_HTML_END = b"</body></html>"
+
+def render_detailed(stats, out):
+    def write(fragment):
+        out.write(fragment.encode('utf-8'))
+
+    out.write(DETAILED_HTML_START)
+
+    # Build Table 1: Market Open Inside
+    out.write(TABLE1_START)
+    write(build_top_rows(stats, style='detailed'))
+    out.write(TABLE1_END)
+
+    # Build Table 2: Closing Analysis
+    out.write(TABLE2_START)
+    render_closing_rows(build_scenarios(stats), write)
+    out.write(TABLE2_END)
+
+    out.write(DETAILED_HTML_END)
+
+# --------------------------------------------------------------------------------
+# FULL VARIANT
+# --------------------------------------------------------------------------------
+
+FULL_HTML_START = (html_start("""        .sub-scenario td { padding-left: 25px; font-size: 13px; color: #555; }
+        .summary-row td { background-color: #fff8e1; border-top: 2px solid #ffd54f; font-weight: 600; }
+        .gap-stat { font-size: 12px; color: #444; margin-top: 4px; display: block; }
+""") + """
+    <div class="grid-container">
+        <table>
+            <thead>
+                <tr>
+                    <th style="width: 15%">Market Open<br><span style="font-weight:normal; font-size:10px">(First 5-min candle: open & close both inside prev day range)</span></th>
+                    <th style="width: 6%">% Probability<br>(days analyzed)</th>
+                    <th style="width: 15%">1st Order Move</th>
+                    <th style="width: 6%">% Probability<br>(days)</th>
+                    <th style="width: 10%">Time to Hit 1st Order<br>(minutes after 9:15)</th>
+                    <th style="width: 15%">2nd Order Move</th>
+                    <th style="width: 6%">% Probability<br>(days)</th>
+                    <th style="width: 10%">Time to Hit 2nd Order</th>
+                    <th style="width: 8%">VIX</th>
+                    <th style="width: 9%">Example Dates<br>(recent)</th>
+                </tr>
+            </thead>
+            <tbody>
+""").encode('utf-8')
+
+FULL_HTML_END = b"""
+            </tbody>
+        </table>
+    </div>
+
+</body>
+</html>
+"""
+
+# Open breakdown of the close above/below summary rows
+BREAKDOWN_TMPL = """
+<strong>Opened Above:</strong> {above} ({above_pct}%) | 
+<strong>Opened Inside:</strong> {inside} ({inside_pct}%) | 
+<strong>Opened Below:</strong> {below} ({below_pct}%)
+"""
+
+def render_full(stats, out):
+    def write(fragment):
+        out.write(fragment.encode('utf-8'))
+
+    out.write(FULL_HTML_START)
+
+    # SCENARIOS A/B/C (TOUCH HIGH / TOUCH LOW / STAYED INSIDE)
+    write(build_top_rows(stats, style='full'))
+
+    # BOTTOM ROWS (CLOSE ANALYSIS)
+    # Close Above
+    close_above = stats['close_above']
+    breakdown_above = BREAKDOWN_TMPL.format(**close_above['breakdown'], **close_above['breakdown_pct'])
+
+    row_close_above = f"""
+                    <!-- CLOSE ABOVE -->
+                    <tr class="summary-row">
+                        <td>Open: Above or below or inside<br>Close: Above prev day high</td>
+                        <td><strong>{close_above['prob']}%</strong><br>({close_above['count']} days)</td>
+                        <td colspan="6">{breakdown_above}</td>
+                        <td>{close_above['_vix_html']}</td>
+                        <td>-</td>
+                    </tr>
+    """
+    write(row_close_above)
+
+    # Close Below
+    close_below = stats['close_below']
+    breakdown_below = BREAKDOWN_TMPL.format(**close_below['breakdown'], **close_below['breakdown_pct'])
+
+    row_close_below = f"""
+                    <!-- CLOSE BELOW -->
+                    <tr class="summary-row">
+                        <td>Open: Above or below or inside<br>Close: Below prev day low</td>
+                        <td><strong>{close_below['prob']}%</strong><br>({close_below['count']} days)</td>
+                        <td colspan="6">{breakdown_below}</td>
+                        <td>{close_below['_vix_html']}</td>
+                        <td>-</td>
+                    </tr>
+    """
+    write(row_close_below)
+
+    out.write(FULL_HTML_END)
+
+# --------------------------------------------------------------------------------
+# ENTRYPOINT
+# --------------------------------------------------------------------------------
+
+RENDERERS = {
+    'detailed': render_detailed,
+    'full': render_full,
+}
+
+# Renderer sources: editing the generator invalidates the outputs like a stats change
+GENERATOR_SOURCES = (__file__, _html_fragments.__file__)
+
+def _file_digest(*paths):
+    h = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        with open(path, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def _is_up_to_date(out_path, digest):
+    """
+    True if out_path was generated from inputs with the given digest and is still
+    exactly what was written then (not deleted, truncated, or patched in place by
+    the update_* scripts).
+    """
+    try:
+        with open(out_path + '.hash', 'r') as f:
+            input_digest, output_digest = f.read().split()
+        return input_digest == digest and _file_digest(out_path) == output_digest
+    except (FileNotFoundError, ValueError):  # missing output/sidecar, or an old one-digest sidecar
+        return False
+
+def _write_gzip(path, compresslevel=6):
+    """Write a pre-compressed '<path>.gz' copy next to path."""
+    with open(path, 'rb') as src, gzip.open(path + '.gz', 'wb', compresslevel=compresslevel) as dst:
+        shutil.copyfileobj(src, dst, 1 << 16)
+
+def _gzip_is_current(path):
+    """True if '<path>.gz' exists and was written after path."""
+    try:
+        return os.path.getmtime(path + '.gz') >= os.path.getmtime(path)
+    except OSError:
+        return False
+
+def main(variant=None, force=False, compress=False):
+    """Write the requested variant (or both) from a single load of the stats file.
+
+    Each output has a sidecar '<output>.hash' with the digest of its inputs (stats file
+    and generator source) and of the output as written; outputs whose inputs are
+    unchanged and whose file is untouched are skipped unless force=True.
+    With compress=True a gzipped '<output>.gz' copy is written alongside, also for
+    skipped outputs whose copy is missing or older than the output.
+    """
+    variants = [variant] if variant else list(RENDERERS)
+    digest = _file_digest(STATS_PATH, *GENERATOR_SOURCES)
+
+    pending = []
+    for name in variants:
+        if not force and _is_up_to_date(OUTPUT_PATHS[name], digest):
+            print(f"Cache hit, output up to date: {OUTPUT_PATHS[name]}")
+            if compress and not _gzip_is_current(OUTPUT_PATHS[name]):
+                _write_gzip(OUTPUT_PATHS[name])
+        else:
+            pending.append(name)
+    if not pending:
+        return
+
+    stats = precompute_html(load_stats(STATS_PATH))
+
+    # Rows are streamed to the file as they are generated instead of building
+    # the whole document in memory first.
+    for name in pending:
+        with open(OUTPUT_PATHS[name], 'wb', buffering=1 << 16) as out:
+            RENDERERS[name](stats, out)
+        if compress:
+            _write_gzip(OUTPUT_PATHS[name])
+        with open(OUTPUT_PATHS[name] + '.hash', 'w') as f:
+            f.write(f"{digest} {_file_digest(OUTPUT_PATHS[name])}")
+        print(f"✅ {name.capitalize()} Table Generated: {OUTPUT_PATHS[name]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the MASTER_TRADING_TABLE HTML files")
+    parser.add_argument("variant", nargs="?", choices=list(RENDERERS), help="Only generate this variant (default: all)")
+    parser.add_argument("--force", action="store_true", help="Regenerate even if the stats file is unchanged")
+    parser.add_argument("--gzip", action="store_true", help="Also write a gzipped copy (<output>.gz)")
+    args = parser.parse_args()
+    main(args.variant, force=args.force, compress=args.gzip)
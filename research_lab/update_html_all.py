@@ -0,0 +1,47 @@
+"""
+Apply several MASTER_TRADING_TABLE updaters with a single read/write of the HTML
+
+    python update_html_all.py --all
+    python update_html_all.py corrected vix_timing
+
+The literal edits of each selected updater are applied as one substitution
+pass, in order, so the result matches running the scripts one after another;
+the split-rows transform (if selected) runs on the result.
+"""
+import argparse
+
+import update_html_split
+import update_html_with_corrected_data
+import update_vix_timing
+from _html_updates import HTML_PATH, apply_updates
+
+# name -> (edits builder, transforms), in the order the scripts are normally run
+UPDATERS = {
+    'corrected': (update_html_with_corrected_data.build_edits, ()),
+    'vix_timing': (update_vix_timing.build_edits, ()),
+    'split': (None, (update_html_split.split_rows,)),
+}
+
+def main(names):
+    edit_groups = []
+    transforms = []
+    for name in names:
+        build_edits, name_transforms = UPDATERS[name]
+        if build_edits is not None:
+            edit_groups.append(build_edits())
+        transforms.extend(name_transforms)
+
+    apply_updates(HTML_PATH, edit_groups, transforms)
+    print(f"✅ HTML updated ({', '.join(names)}): {HTML_PATH}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply MASTER_TRADING_TABLE updaters in one read/write")
+    parser.add_argument("updaters", nargs="*", help=f"Updaters to apply ({', '.join(UPDATERS)})")
+    parser.add_argument("--all", action="store_true", help="Apply every updater")
+    args = parser.parse_args()
+    if not args.all and not args.updaters:
+        parser.error("name at least one updater or pass --all")
+    unknown = set(args.updaters) - set(UPDATERS)
+    if unknown:
+        parser.error(f"unknown updater(s): {', '.join(sorted(unknown))}")
+    main(list(UPDATERS) if args.all else [n for n in UPDATERS if n in args.updaters])
@@ -5,9 +5,149 @@ Implements the 5 core strategies using vectorbt for high-performance backtesting
 All functions accept pandas Series/DataFrames and return boolean signal Series.
 """
 
+import weakref
+from collections import OrderedDict
+
 import vectorbt as vbt
 import pandas as pd
 import numpy as np
+from numba import njit
+
+# Indicator caches, keyed on (id(close), params...). Parameter sweeps call the
+# signal functions many times with the same close Series, so each indicator is
+# only built once per input. Entries hold only a weak reference to the input:
+# they are dropped when it is garbage collected, and an id() reused by another
+# Series never matches. Each cache keeps at most _CACHE_SIZE entries (least
+# recently used evicted first). Results are not recomputed when an input is
+# modified in place; call clear_indicator_cache() after doing that.
+_CACHE_SIZE = 64
+_MA_CACHE = OrderedDict()
+_RSI_CACHE = OrderedDict()
+_BB_CACHE = OrderedDict()
+
+def _cached(cache, series, params, build):
+    key = (id(series),) + params
+    hit = cache.get(key)
+    if hit is not None and hit[0]() is series:
+        cache.move_to_end(key)
+        return hit[1]
+    value = build()
+    cache[key] = (weakref.ref(series, lambda _, key=key: cache.pop(key, None)), value)
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+    return value
+
+def _ema(close, window):
+    # Same as vbt.MA.run(close, window=window, ewm=True).ma (adjust=False, NaN for the
+    # first window-1 bars) without building an indicator object per call
+    return _cached(_MA_CACHE, close, (window, True),
+                   lambda: close.ewm(span=window, min_periods=window, adjust=False).mean())
+
+def _rsi(close, window):
+    return _cached(_RSI_CACHE, close, (window,), lambda: vbt.RSI.run(close, window=window).rsi)
+
+def _bbands(close, window, alpha):
+    return _cached(_BB_CACHE, close, (window, alpha), lambda: vbt.BBANDS.run(close, window=window, alpha=alpha))
+
+def clear_indicator_cache():
+    """Drop all cached indicators (call when the input data is regenerated)."""
+    _MA_CACHE.clear()
+    _RSI_CACHE.clear()
+    _BB_CACHE.clear()
+
+@njit(cache=True)
+def _breakout_signals_nb(high, low, close, window):
+    """
+    entries[i] = close[i] > max(high[i-window:i]), exits[i] = close[i] < min(low[i-window:i])
+
+    Equivalent to comparing close with rolling(window).max()/.min() shifted by one bar,
+    in a single pass using monotonic deques (ring buffers of bar indices) for the
+    running max of high and min of low. As in pandas, a window containing a NaN has
+    no max/min, so no signal is raised until the NaN has left the window.
+    """
+    n = close.shape[0]
+    entries = np.zeros(n, dtype=np.bool_)
+    exits = np.zeros(n, dtype=np.bool_)
+    q_max = np.empty(window, dtype=np.int64)
+    q_min = np.empty(window, dtype=np.int64)
+    max_head = max_len = min_head = min_len = 0
+    # Index of the last NaN high/low seen (NaNs also stall the deques, which is
+    # harmless since everything queued before a NaN leaves the window before it)
+    nan_high = nan_low = -1
+    for i in range(n):
+        # Deques hold the previous window [i-window, i-1] here
+        if i >= window:
+            entries[i] = nan_high < i - window and close[i] > high[q_max[max_head]]
+            exits[i] = nan_low < i - window and close[i] < low[q_min[min_head]]
+        if np.isnan(high[i]):
+            nan_high = i
+        if np.isnan(low[i]):
+            nan_low = i
+        # Slide to [i-window+1, i]
+        if max_len > 0 and q_max[max_head] <= i - window:
+            max_head = (max_head + 1) % window
+            max_len -= 1
+        while max_len > 0 and high[q_max[(max_head + max_len - 1) % window]] <= high[i]:
+            max_len -= 1
+        q_max[(max_head + max_len) % window] = i
+        max_len += 1
+        if min_len > 0 and q_min[min_head] <= i - window:
+            min_head = (min_head + 1) % window
+            min_len -= 1
+        while min_len > 0 and low[q_min[(min_head + min_len - 1) % window]] >= low[i]:
+            min_len -= 1
+        q_min[(min_head + min_len) % window] = i
+        min_len += 1
+    return entries, exits
+
+@njit(cache=True)
+def _crossover_nb(fast, slow, close, trend):
+    """
+    entries[i] = fast[i] > slow[i] and close[i] > trend[i] and fast[i-1] <= slow[i-1]
+    exits[i] = fast[i] < slow[i]
+
+    Single pass over the four arrays; NaN comparisons are False as in pandas.
+    """
+    n = close.shape[0]
+    entries = np.zeros(n, dtype=np.bool_)
+    exits = np.zeros(n, dtype=np.bool_)
+    for i in range(n):
+        above = fast[i] > slow[i]
+        exits[i] = fast[i] < slow[i]
+        if i > 0 and above and close[i] > trend[i] and fast[i - 1] <= slow[i - 1]:
+            entries[i] = True
+    return entries, exits
+
+def _breakout_signals(high, low, close, window):
+    entries, exits = _breakout_signals_nb(
+        high.to_numpy(dtype=np.float64), low.to_numpy(dtype=np.float64),
+        close.to_numpy(dtype=np.float64), int(window))
+    return pd.Series(entries, index=close.index), pd.Series(exits, index=close.index)
+
+@njit(cache=True, error_model='numpy')
+def _vwap_nb(high, low, close, volume, session):
+    """
+    VWAP in one pass: cumsum(typical_price * volume) / cumsum(volume), with both
+    sums reset whenever the session id changes.
+    """
+    n = close.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    cum_tp_v = 0.0
+    cum_vol = 0.0
+    for i in range(n):
+        if i > 0 and session[i] != session[i - 1]:
+            cum_tp_v = 0.0
+            cum_vol = 0.0
+        cum_tp_v += (high[i] + low[i] + close[i]) / 3 * volume[i]
+        cum_vol += volume[i]
+        out[i] = cum_tp_v / cum_vol
+    return out
+
+def _session_ids(index, anchor):
+    """int64 session id per bar (one per calendar day for anchor='D'); all zeros if unanchored."""
+    if anchor == 'D' and isinstance(index, pd.DatetimeIndex):
+        return index.normalize().asi8
+    return np.zeros(len(index), dtype=np.int64)
 
 # 1. VWAP Trend
 def vwap_trend_signals(close, high, low, volume, vwap_anchor='D'):
@@ -16,17 +156,16 @@ def vwap_trend_signals(close, high, low, volume, vwap_anchor='D'):
     Note: Standard VWAP calculation requires intraday data.
     """
     # Calculate VWAP manually (Cumulative(Price * Vol) / Cumulative(Vol))
-    # Resetting daily is complex in vectorized without time grouping
-    # Approximation: Rolling VWAP or just typical price * vol / vol
-    
-    typical_price = (high + low + close) / 3
-    tp_v = typical_price * volume
-    cum_tp_v = tp_v.cumsum()
-    cum_vol = volume.cumsum()
-    vwap = cum_tp_v / cum_vol
+    # With vwap_anchor='D' the cumulative sums restart at each session (day);
+    # any other anchor keeps a single running VWAP over the whole history.
+    session = _session_ids(close.index, vwap_anchor)
+    vwap = pd.Series(_vwap_nb(high.to_numpy(dtype=np.float64), low.to_numpy(dtype=np.float64),
+                              close.to_numpy(dtype=np.float64), volume.to_numpy(dtype=np.float64),
+                              session),
+                     index=close.index)
     
     # Trend Filter
-    ema_20 = vbt.MA.run(close, window=20, ewm=True).ma
+    ema_20 = _ema(close, 20)
     
     entries = (close > vwap) & (close > ema_20)
     exits = (close < vwap)
@@ -37,13 +176,14 @@ def ema_alignment_signals(close, fast_period=9, slow_period=21, trend_period=200
     """
     Signal: Fast EMA > Slow EMA AND Close > 200 EMA
     """
-    ema_fast = vbt.MA.run(close, window=fast_period, ewm=True).ma
-    ema_slow = vbt.MA.run(close, window=slow_period, ewm=True).ma
-    ema_trend = vbt.MA.run(close, window=trend_period, ewm=True).ma
+    ema_fast = _ema(close, fast_period)
+    ema_slow = _ema(close, slow_period)
+    ema_trend = _ema(close, trend_period)
     
-    entries = (ema_fast > ema_slow) & (close > ema_trend) & (ema_fast.shift(1) <= ema_slow.shift(1)) # Crossover
-    exits = (ema_fast < ema_slow)
-    return entries, exits
+    # Crossover: (ema_fast > ema_slow) & (close > ema_trend) & (ema_fast.shift(1) <= ema_slow.shift(1))
+    entries, exits = _crossover_nb(ema_fast.to_numpy(dtype=np.float64), ema_slow.to_numpy(dtype=np.float64),
+                                   close.to_numpy(dtype=np.float64), ema_trend.to_numpy(dtype=np.float64))
+    return pd.Series(entries, index=close.index), pd.Series(exits, index=close.index)
 
 # 3. ORB (Opening Range Breakout)
 def orb_signals(high, low, close, time_index, orb_minutes=15):
@@ -63,12 +203,8 @@ def orb_signals(high, low, close, time_index, orb_minutes=15):
     # For now, using a simple breakout logic as proxy
     
     # Proxy: Donchian Channel Breakout of last N bars (where N ~ 15 mins)
-    upper = high.rolling(int(orb_minutes)).max()
-    lower = low.rolling(int(orb_minutes)).min()
-    
-    entries = (close > upper.shift(1))
-    exits = (close < lower.shift(1))
-    return entries, exits
+    # (close vs rolling max high / min low of the previous N bars, fused in one pass)
+    return _breakout_signals(high, low, close, orb_minutes)
 
 # 4. Structure Shift (Approximation)
 def structure_shift_signals(high, low, close, lookback=10):
@@ -76,20 +212,16 @@ def structure_shift_signals(high, low, close, lookback=10):
     Signal: Break of recent Swing High (Higher High)
     """
     # Vectorized Swing High: Max of last N bars
-    recent_high = high.rolling(lookback).max()
-    recent_low = low.rolling(lookback).min()
-    
-    entries = (close > recent_high.shift(1))
-    exits = (close < recent_low.shift(1))
-    return entries, exits
+    # (close vs recent_high / recent_low of the previous `lookback` bars)
+    return _breakout_signals(high, low, close, lookback)
 
 # 5. Mean Reversion (RSI + BB)
 def mean_reversion_signals(close, rsi_period=14, rsi_lower=30, rsi_upper=70, bb_period=20, bb_std=2):
     """
     Signal: RSI < 30 AND Close < Lower BB (Oversold)
     """
-    rsi = vbt.RSI.run(close, window=rsi_period).rsi
-    bb = vbt.BBANDS.run(close, window=bb_period, alpha=bb_std)
+    rsi = _rsi(close, rsi_period)
+    bb = _bbands(close, bb_period, bb_std)
     
     entries = (rsi < rsi_lower) & (close < bb.lower)
     exits = (rsi > rsi_upper) | (close > bb.middle) # Exit at overbought or mean
@@ -0,0 +1,187 @@
+"""
+Shared NIFTY 50 minute-data pipeline for the PDR analysis scripts
+
+atr_analysis.py and deep_dive_above_above.py both load the minute CSV,
+resample it to 5-minute market-hours candles and derive the previous day
+range (PDR) levels from it. get_preprocessed() memoizes both per file path
+and mtime, so further analyses in the same session reuse them; the returned
+frames are shared and must not be modified in place.
+"""
+import hashlib
+import os
+from functools import lru_cache
+
+import pandas as pd
+import numpy as np
+
+def _source_key(path):
+    """(size, mtime_ns) of path, stored with the caches derived from it."""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+def _read_cache(cache_path, source):
+    """Returns the frame cached at cache_path if it was built from `source`, else None."""
+    try:
+        cached = pd.read_parquet(cache_path)
+    except (FileNotFoundError, ImportError):
+        return None
+    # Caches written before the source key was stored have no attrs and are rebuilt
+    return cached if cached.attrs.get('source') == source else None
+
+def load_and_preprocess_data(file_path):
+    """
+    Loads Nifty 50 minute data, resamples to 5-minute candles, and filters for market hours.
+    """
+    print(f"Loading data from: {file_path}")
+    try:
+        source = _source_key(file_path)
+    except FileNotFoundError:
+        print(f"Error: File not found at {file_path}")
+        return None
+
+    # Parsed minute data is cached next to the CSV (typed datetime index, no
+    # string parsing); rebuilt whenever the CSV's size or mtime differs from
+    # the one the cache was written from
+    cache_path = file_path + '.parquet'
+    df = _read_cache(cache_path, source)
+    if df is None:
+        df = pd.read_csv(file_path)
+        df['datetime'] = pd.to_datetime(df['date'])
+        df.set_index('datetime', inplace=True)
+        
+        if 'date' in df.columns:
+            df.drop(columns=['date'], inplace=True)
+        
+        df.attrs['source'] = source
+        try:
+            df.to_parquet(cache_path, compression='snappy')
+        except ImportError:
+            pass  # no parquet engine (pyarrow) installed: parse the CSV every run
+
+    ohlc_dict = {
+        'open': 'first',
+        'high': 'max',
+        'low': 'min',
+        'close': 'last',
+        'volume': 'sum'
+    }
+    
+    df_5min = df.resample('5min').agg(ohlc_dict)
+    df_5min.dropna(inplace=True)
+
+    # Market hours (both ends inclusive), filtered on the index's time of day
+    df_5min = df_5min.between_time("09:15:00", "15:25:00").copy()
+    
+    return df_5min
+
+def _prefix_digest(path, size):
+    """blake2b digest of the first `size` bytes of path."""
+    h = hashlib.blake2b()
+    with open(path, 'rb') as f:
+        while size > 0:
+            chunk = f.read(min(size, 1 << 20))
+            if not chunk:
+                break
+            h.update(chunk)
+            size -= len(chunk)
+    return h.hexdigest()
+
+def update_daily_cache(cache_path, df_5min, build, source_path):
+    """
+    Returns the per-day frame build(df_5min), reusing the days saved at cache_path.
+
+    The cache stores the (size, mtime_ns) and a digest of source_path, the CSV
+    df_5min was loaded from. If the CSV is unchanged the cached frame is
+    returned as is; if rows were only appended to it, past days are kept and
+    just the last cached day (which may have been partial) and the days after
+    it are rebuilt from the candles. Any other change (a replaced, corrected or
+    shortened CSV) rebuilds every day. Without a parquet engine everything is
+    rebuilt.
+    """
+    source = _source_key(source_path)
+    try:
+        cached = pd.read_parquet(cache_path)
+    except (FileNotFoundError, ImportError):
+        cached = None
+
+    # [size, mtime_ns, digest of those size bytes] of the CSV the cache was built from
+    stored = cached.attrs.get('source') if cached is not None and len(cached) else None
+    if stored is not None and stored[:2] == source:
+        return cached
+
+    if (stored is not None and source[0] >= stored[0]
+            and _prefix_digest(source_path, stored[0]) == stored[2]):
+        last_day = cached.index[-1]
+        daily = pd.concat([cached[cached.index < last_day], build(df_5min[df_5min.index >= last_day])])
+    else:
+        daily = build(df_5min)
+
+    daily.attrs['source'] = source + [_prefix_digest(source_path, source[0])]
+    try:
+        daily.to_parquet(cache_path)
+    except ImportError:
+        pass
+    return daily
+
+def _body_range(df_5min):
+    # Body high/low of each day: per-column groupby reductions (keys come out sorted)
+    grouped = df_5min.groupby('day')
+    body_range = pd.DataFrame({
+        'day_max': np.maximum(grouped['open'].max(), grouped['close'].max()),
+        'day_min': np.minimum(grouped['open'].min(), grouped['close'].min())
+    })
+    body_range.index.name = 'date'
+    return body_range
+
+def calculate_daily_stats(df_5min, cache_path=None, source_path=None):
+    """
+    Calculates Previous Day Range (PDR) stats based on candle bodies (Open/Close).
+    With cache_path, the per-day body high/low is updated incrementally on disk
+    (see update_daily_cache); source_path is the CSV df_5min was loaded from.
+    """
+    # Day key: midnight timestamp of each candle (datetime64, hashed as int64 by
+    # groupby rather than as Python date objects); matches resample('D') labels
+    df_5min['day'] = df_5min.index.normalize()
+    
+    if cache_path is None:
+        stats_df = _body_range(df_5min)
+    else:
+        stats_df = update_daily_cache(cache_path, df_5min, _body_range, source_path)
+    
+    stats_df['prev_day_max'] = stats_df['day_max'].shift(1)
+    stats_df['prev_day_min'] = stats_df['day_min'].shift(1)
+    
+    stats_df.dropna(inplace=True)
+    
+    stats_df['range_height'] = stats_df['prev_day_max'] - stats_df['prev_day_min']
+    stats_df['buffer'] = stats_df['range_height'] * 0.05
+    
+    stats_df['resistance'] = stats_df['prev_day_max'] + stats_df['buffer']
+    stats_df['support'] = stats_df['prev_day_min'] - stats_df['buffer']
+    
+    return stats_df
+
+# Price states relative to the previous day's support/resistance band
+BELOW, INSIDE, ABOVE = 0, 1, 2
+
+def classify_levels(price, support, resistance):
+    """
+    Classifies each price (array-wise) as BELOW support, ABOVE resistance or INSIDE.
+    """
+    return np.select([price < support, price > resistance], [BELOW, ABOVE], default=INSIDE).astype(np.uint8)
+
+@lru_cache(maxsize=4)
+def _load_cached(file_path, mtime):
+    df_5min = load_and_preprocess_data(file_path)
+    if df_5min is None:
+        return None, None
+    return df_5min, calculate_daily_stats(df_5min, cache_path=file_path + '.daily_stats.parquet',
+                                          source_path=file_path)
+
+def get_preprocessed(file_path):
+    """
+    Returns (df_5min, daily_stats) for file_path, or (None, None) if the file is missing.
+    """
+    # mtime is part of the cache key, so an updated CSV is reloaded
+    mtime = os.path.getmtime(file_path) if os.path.exists(file_path) else None
+    return _load_cached(file_path, mtime)
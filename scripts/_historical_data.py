@@ -0,0 +1,41 @@
+"""
+Unique-index handling of the historical_data table, shared by the Kite downloaders
+
+download_now.py and download_kite_data.py both bulk-load an empty table
+without its (symbol, datetime) unique index and build the index once the rows
+are in. prepare_load() and finish_load() must run inside the same transaction
+as the inserts, so an interrupted load never leaves the table without its index.
+"""
+
+CREATE_INDEX_SQL = 'CREATE UNIQUE INDEX IF NOT EXISTS idx_sym_dt ON historical_data(symbol, datetime)'
+
+# Keeps the newest row per (symbol, datetime), as INSERT OR REPLACE would have
+DEDUPE_SQL = '''
+    DELETE FROM historical_data WHERE id NOT IN
+    (SELECT MAX(id) FROM historical_data GROUP BY symbol, datetime)
+'''
+
+def has_unique_index(cursor):
+    """True if (symbol, datetime) is unique: inline on older tables, through idx_sym_dt on newer ones."""
+    return any(idx[2] for idx in cursor.execute("PRAGMA index_list(historical_data)").fetchall())
+
+def prepare_load(cursor):
+    """
+    Returns True for a bulk load (rows can be appended without conflict checks).
+
+    An empty table loses idx_sym_dt until finish_load(). A non-empty table
+    without a unique index (left by a load that ran outside a transaction) is
+    deduplicated and indexed first, so rows already stored can be replaced.
+    """
+    if cursor.execute("SELECT 1 FROM historical_data LIMIT 1").fetchone() is None:
+        cursor.execute("DROP INDEX IF EXISTS idx_sym_dt")
+    elif not has_unique_index(cursor):
+        cursor.execute(DEDUPE_SQL)
+        cursor.execute(CREATE_INDEX_SQL)
+    # Tables with the inline UNIQUE constraint keep it, so they are never bulk-loaded
+    return not has_unique_index(cursor)
+
+def finish_load(cursor, bulk):
+    """Builds the unique index after a bulk load."""
+    if bulk:
+        cursor.execute(CREATE_INDEX_SQL)
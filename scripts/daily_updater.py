@@ -7,18 +7,25 @@ import pandas as pd
 from datetime import datetime, timedelta
 from kiteconnect import KiteConnect
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import os
-import time
 import sys
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import config
+from utils.rate_limiter import RateLimiter
 from utils.logger import setup_logger
 
 # Access token file (will be created after first authentication)
 TOKEN_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_storage", ".kite_access_token")
 
+INSERT_SQL = '''
+    INSERT OR REPLACE INTO historical_data
+    (symbol, datetime, open, high, low, close, volume)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
 logger = setup_logger("daily_updater")
 
 def load_access_token():
@@ -101,56 +108,55 @@ def update_data(kite):
     # Connect to database
     db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_storage", "database", "tradealgo.db")
     conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     cursor = conn.cursor()
     
     successful = 0
     failed = 0
     total_bars = 0
     
+    # Instrument dump is fetched once; tokens are looked up by trading symbol
+    instruments = kite.instruments("NSE")
+    token_by_sym = {inst['tradingsymbol']: inst['instrument_token'] for inst in instruments}
+    
+    # Fetch symbols concurrently (the rate limit is per second, not per connection);
+    # results are written to the database here, on the main thread, in symbol order
+    limiter = RateLimiter(3)  # ~3 requests per second
+    
+    def fetch(token):
+        limiter.wait()
+        # Fetch 1-minute data
+        return kite.historical_data(
+            instrument_token=token,
+            from_date=start_date,
+            to_date=end_date,
+            interval="minute"
+        )
+    
+    executor = ThreadPoolExecutor(max_workers=3)
+    futures = {symbol: executor.submit(fetch, token_by_sym[symbol]) for symbol in symbols if symbol in token_by_sym}
+    
     for i, symbol in enumerate(symbols, 1):
         try:
             print(f"[{i}/{len(symbols)}] {symbol}...", end=' ', flush=True)
             
-            # Get instrument
-            instruments = kite.instruments("NSE")
-            instrument = next((inst for inst in instruments if inst['tradingsymbol'] == symbol), None)
-            
-            if not instrument:
+            if symbol not in futures:
                 print(f"❌ Not found")
                 failed += 1
                 continue
             
-            # Fetch 1-minute data
-            data = kite.historical_data(
-                instrument_token=instrument['instrument_token'],
-                from_date=start_date,
-                to_date=end_date,
-                interval="minute"
-            )
+            data = futures[symbol].result()
             
             if data:
-                # Save to database
-                new_bars = 0
-                for candle in data:
-                    try:
-                        cursor.execute('''
-                            INSERT OR REPLACE INTO historical_data 
-                            (symbol, datetime, open, high, low, close, volume)
-                            VALUES (?, ?, ?, ?, ?, ?, ?)
-                        ''', (
-                            symbol,
-                            candle['date'].strftime('%Y-%m-%d %H:%M:%S'),
-                            candle['open'],
-                            candle['high'],
-                            candle['low'],
-                            candle['close'],
-                            candle['volume']
-                        ))
-                        new_bars += 1
-                    except:
-                        pass  # Skip duplicates
-                
-                conn.commit()
+                # Save to database (committed once after all symbols)
+                rows = [
+                    (symbol, candle['date'].strftime('%Y-%m-%d %H:%M:%S'),
+                     candle['open'], candle['high'], candle['low'], candle['close'], candle['volume'])
+                    for candle in data
+                ]
+                cursor.executemany(INSERT_SQL, rows)
+                new_bars = len(rows)
                 total_bars += new_bars
                 print(f"✅ {new_bars} new bars")
                 successful += 1
@@ -158,12 +164,12 @@ def update_data(kite):
                 print(f"⚠️  No data")
                 failed += 1
             
-            time.sleep(0.35)  # Rate limiting
-            
         except Exception as e:
             print(f"❌ {str(e)[:40]}")
             failed += 1
     
+    executor.shutdown()
+    conn.commit()
     conn.close()
     
     print("\n" + "="*70)
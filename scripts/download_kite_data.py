@@ -6,12 +6,25 @@ import pandas as pd
 from datetime import datetime, timedelta
 from kiteconnect import KiteConnect
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 import os
 import sys
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import config
+from utils.rate_limiter import RateLimiter
+from _historical_data import finish_load, prepare_load
+
+INSERT_SQL = '''
+    INSERT OR REPLACE INTO historical_data
+    (symbol, datetime, open, high, low, close, volume)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# First load into an empty table: nothing to replace, so rows are appended without
+# the per-row unique-index probe and the index is built once at the end
+BULK_INSERT_SQL = INSERT_SQL.replace('INSERT OR REPLACE', 'INSERT')
 
 def authenticate_kite():
     """Authenticate with Kite API"""
@@ -99,9 +112,14 @@ def download_data(kite):
     # Create database
     os.makedirs("data_storage/database", exist_ok=True)
     conn = sqlite3.connect("data_storage/database/tradealgo.db")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-200000")  # ~200MB page cache
     cursor = conn.cursor()
     
-    # Create table
+    # Create table (the (symbol, datetime) unique index is added after the load;
+    # tables created before keep their inline UNIQUE constraint)
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS historical_data (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -111,68 +129,74 @@ def download_data(kite):
             high REAL,
             low REAL,
             close REAL,
-            volume INTEGER,
-            UNIQUE(symbol, datetime)
+            volume INTEGER
         )
     ''')
     
+    # Empty table: nothing to replace, so rows are appended and the (symbol,
+    # datetime) unique index built once at the end. The index is dropped and
+    # rebuilt in the same transaction as the rows
+    cursor.execute("BEGIN")
+    bulk = prepare_load(cursor)
+    insert_sql = BULK_INSERT_SQL if bulk else INSERT_SQL
+    
     # Download data
     successful = 0
     failed = 0
     
+    # Instrument dump is fetched once; tokens are looked up by trading symbol
+    instruments = kite.instruments("NSE")
+    token_by_sym = {inst['tradingsymbol']: inst['instrument_token'] for inst in instruments}
+    
+    # Fetch symbols concurrently (the rate limit is per second, not per connection);
+    # results are written to the database here, on the main thread, in symbol order
+    limiter = RateLimiter(3)  # ~3 requests per second
+    
+    def fetch(token):
+        limiter.wait()
+        # Fetch historical data (1-minute)
+        return kite.historical_data(
+            instrument_token=token,
+            from_date=start_date,
+            to_date=end_date,
+            interval="minute"
+        )
+    
+    executor = ThreadPoolExecutor(max_workers=3)
+    futures = {symbol: executor.submit(fetch, token_by_sym[symbol]) for symbol in symbols if symbol in token_by_sym}
+    
     for i, symbol in enumerate(symbols, 1):
         try:
             print(f"[{i}/{len(symbols)}] {symbol}...", end=' ', flush=True)
             
-            # Get instruments to find token
-            instruments = kite.instruments("NSE")
-            instrument = next((inst for inst in instruments if inst['tradingsymbol'] == symbol), None)
-            
-            if not instrument:
+            if symbol not in futures:
                 print(f"❌ Not found")
                 failed += 1
                 continue
             
-            # Fetch historical data (1-minute)
-            data = kite.historical_data(
-                instrument_token=instrument['instrument_token'],
-                from_date=start_date,
-                to_date=end_date,
-                interval="minute"
-            )
+            data = futures[symbol].result()
             
             if data:
-                # Save to database
-                for candle in data:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO historical_data 
-                        (symbol, datetime, open, high, low, close, volume)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        symbol,
-                        candle['date'].strftime('%Y-%m-%d %H:%M:%S'),
-                        candle['open'],
-                        candle['high'],
-                        candle['low'],
-                        candle['close'],
-                        candle['volume']
-                    ))
-                
-                conn.commit()
+                # Save to database (committed once after all symbols)
+                rows = [
+                    (symbol, candle['date'].strftime('%Y-%m-%d %H:%M:%S'),
+                     candle['open'], candle['high'], candle['low'], candle['close'], candle['volume'])
+                    for candle in data
+                ]
+                cursor.executemany(insert_sql, rows)
                 print(f"✅ {len(data)} bars")
                 successful += 1
             else:
                 print(f"⚠️  No data")
                 failed += 1
                 
-            # Rate limiting
-            import time
-            time.sleep(0.35)  # ~3 requests per second
-            
         except Exception as e:
             print(f"❌ {str(e)[:30]}")
             failed += 1
     
+    executor.shutdown()
+    finish_load(cursor, bulk)
+    conn.commit()
     conn.close()
     
     # Summary
@@ -3,20 +3,274 @@ Download data with provided request token
 """
 
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from kiteconnect import KiteConnect
+from aiolimiter import AsyncLimiter
+import aiohttp
+import asyncio
+import json
 import sqlite3
+import queue
+import threading
 import os
-import time
 import sys
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.config import config
+from _historical_data import finish_load, prepare_load
+
+# Kite Connect historical candles REST endpoint (called directly so requests can run concurrently)
+HISTORICAL_URL = "https://api.kite.trade/instruments/historical/{token}/minute"
+MAX_CONNECTIONS = 3        # requests in flight (upper bound of the adaptive cap)
+REQUESTS_PER_SECOND = 2.9  # just under Kite's 3 req/s historical limit, absorbing clock skew
+MAX_ATTEMPTS = 4           # per symbol, retrying 429/5xx responses and transport errors
+WRITE_QUEUE_SIZE = 4       # downloaded symbols waiting for the SQLite writer
+
+CANDLE_COLUMNS = ['date', 'open', 'high', 'low', 'close', 'volume']
+
+# Rows already stored for the downloaded range are replaced by deleting the
+# range first, so the new rows can be appended without per-row replacement
+DELETE_RANGE_SQL = '''
+    DELETE FROM historical_data
+    WHERE symbol = ? AND datetime BETWEEN ? AND ?
+'''
+
+# Multi-row INSERT ... VALUES (...),(...): one statement parse and execute per
+# batch instead of per row. Batches are capped at 999 bound parameters (SQLite's
+# default limit before 3.32), i.e. 142 rows of 7 columns
+INSERT_PREFIX = '''
+    INSERT{} INTO historical_data
+    (symbol, datetime, open, high, low, close, volume)
+    VALUES '''
+ROW_PLACEHOLDERS = '(?, ?, ?, ?, ?, ?, ?)'
+ROWS_PER_INSERT = 999 // 7
+
+
+def batch_insert_sql(n_rows, or_ignore=True):
+    return INSERT_PREFIX.format(' OR IGNORE' if or_ignore else '') + ', '.join([ROW_PLACEHOLDERS] * n_rows)
+
+
+# Incremental loads go through the (symbol, datetime) unique index and skip
+# rows it already holds; a first load into the empty table appends plain rows
+# before the index exists
+BATCH_INSERT_SQL = batch_insert_sql(ROWS_PER_INSERT)
+BULK_INSERT_SQL = batch_insert_sql(ROWS_PER_INSERT, or_ignore=False)
 
 # Configuration
 REQUEST_TOKEN = "YOUR_REQUEST_TOKEN_HERE"  # You still need to paste this manually for this script
 
+class AimdThrottle:
+    """
+    Adaptive cap on in-flight requests (AIMD) plus server-requested pauses
+
+    Each successful response raises the cap by 0.5 (up to max_concurrency); a
+    429/5xx halves it (down to 1). Retry-After on a throttled response, or an
+    exhausted X-RateLimit-Remaining, pauses all new requests for that long.
+    """
+
+    def __init__(self, max_concurrency):
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self._cond = asyncio.Condition()
+        self._resume_at = 0.0  # loop time before which no request may start
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < int(self.concurrency))
+            self.in_flight += 1
+        await self.wait_if_throttled()
+
+    async def wait_if_throttled(self):
+        loop = asyncio.get_running_loop()
+        while (delay := self._resume_at - loop.time()) > 0:
+            await asyncio.sleep(delay)
+
+    async def release(self, status=None, headers=None):
+        """Free the slot and adapt to the response (status None: no response, no change)"""
+        try:
+            headers = headers or {}
+            now = asyncio.get_running_loop().time()
+            if status == 429 or (status is not None and status >= 500):
+                self.concurrency = max(1.0, self.concurrency * 0.5)
+                self._resume_at = max(self._resume_at, now + retry_after(headers))
+            elif status is not None:
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + 0.5)
+                try:
+                    remaining = int(headers.get('X-RateLimit-Remaining', 10))
+                except ValueError:
+                    remaining = 10
+                if remaining < 2:
+                    self._resume_at = max(self._resume_at, now + retry_after(headers))
+        finally:
+            # The slot is always freed, whatever the headers held
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+
+def retry_after(headers, default=1.0):
+    """Seconds to wait from a Retry-After header: delay-seconds or an HTTP-date (RFC 9110)"""
+    value = headers.get('Retry-After')
+    if value is None:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)  # HTTP-dates are always GMT
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def error_message(status, body):
+    """Kite's error 'message' from a non-200 response body, which may not be JSON"""
+    try:
+        return json.loads(body)['message']
+    except (ValueError, TypeError, KeyError):
+        return f"HTTP {status}"
+
+
+async def fetch_candles(session, throttle, limiter, instrument_token, start_date, end_date):
+    """GET the 1-minute candles of one instrument from Kite's historical data endpoint"""
+    params = {
+        'from': start_date.strftime('%Y-%m-%d %H:%M:%S'),
+        'to': end_date.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    for attempt in range(MAX_ATTEMPTS):
+        await throttle.acquire()
+        status = headers = None
+        try:
+            async with limiter:
+                async with session.get(HISTORICAL_URL.format(token=instrument_token), params=params) as resp:
+                    status, headers = resp.status, resp.headers
+                    if status == 200:
+                        payload = await resp.json(content_type=None)
+                    else:
+                        error = error_message(status, await resp.text())
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # No (complete) response: retried without adapting the throttle
+            status = headers = None
+            error = str(e) or type(e).__name__
+        finally:
+            await throttle.release(status, headers)
+
+        if status == 200:
+            # Rows of CANDLE_COLUMNS, timestamp like 2024-01-01T09:15:00+0530
+            return payload['data']['candles']
+        if status is not None and status != 429 and status < 500:
+            break  # not retryable
+    raise RuntimeError(error)
+
+
+def candle_frame(symbol, candles):
+    """historical_data rows (symbol, datetime, open, high, low, close, volume) for Kite candles"""
+    df = pd.DataFrame(candles, columns=CANDLE_COLUMNS)
+    # '2024-01-01T09:15:00+0530' -> '2024-01-01 09:15:00' as whole-column string ops
+    df['date'] = df['date'].str.slice(0, 19).str.replace('T', ' ', regex=False)
+    df.insert(0, 'symbol', symbol)
+    return df.rename(columns={'date': 'datetime'})
+
+
+def save_candles(cursor, symbol, candles, bulk=False):
+    """
+    Replace the symbol's stored rows over the candles' range
+
+    bulk: first load into an empty, unindexed table; rows are only appended.
+    """
+    df = candle_frame(symbol, candles)
+    if not bulk:
+        cursor.execute(DELETE_RANGE_SQL, (symbol, df['datetime'].iloc[0], df['datetime'].iloc[-1]))
+
+    # Object array: ravel().tolist() gives the flat parameters as Python scalars
+    rows = df.to_numpy(dtype=object)
+    full = len(rows) - len(rows) % ROWS_PER_INSERT
+    for start in range(0, full, ROWS_PER_INSERT):
+        cursor.execute(BULK_INSERT_SQL if bulk else BATCH_INSERT_SQL,
+                       rows[start:start + ROWS_PER_INSERT].ravel().tolist())
+    if full < len(rows):
+        cursor.execute(batch_insert_sql(len(rows) - full, or_ignore=not bulk), rows[full:].ravel().tolist())
+
+
+def write_candles(cursor, write_queue, unsaved, bulk=False):
+    """
+    SQLite writer thread: save (symbol, candles) items from write_queue until None
+
+    Symbols whose rows could not be saved are appended to unsaved; each symbol
+    is saved under a savepoint, so a failed insert also undoes its range DELETE.
+    """
+    while (item := write_queue.get()) is not None:
+        symbol, candles = item
+        cursor.execute("SAVEPOINT sym")
+        try:
+            save_candles(cursor, symbol, candles, bulk)
+        except Exception as e:
+            cursor.execute("ROLLBACK TO sym")
+            print(f"\n❌ {symbol} not saved: {str(e)[:40]}")
+            unsaved.append(symbol)
+        cursor.execute("RELEASE sym")
+
+
+async def download_symbols(write_queue, symbols, tokens, start_date, end_date, access_token):
+    """
+    Fetch all symbols concurrently and hand them to the SQLite writer thread
+
+    Requests overlap up to MAX_CONNECTIONS in flight (adapted by AimdThrottle)
+    and REQUESTS_PER_SECOND started; results are awaited (and queued for writing) in symbol order.
+    Returns (successful, failed) counts.
+    """
+    successful = 0
+    failed = 0
+
+    headers = {
+        'X-Kite-Version': '3',
+        'Authorization': f"token {config.kite_api_key}:{access_token}",
+    }
+    throttle = AimdThrottle(MAX_CONNECTIONS)
+    limiter = AsyncLimiter(REQUESTS_PER_SECOND, 1)
+
+    async with aiohttp.ClientSession(headers=headers, timeout=aiohttp.ClientTimeout(total=60)) as session:
+        tasks = {
+            symbol: asyncio.create_task(fetch_candles(
+                session, throttle, limiter, tokens[symbol], start_date, end_date
+            ))
+            for symbol in symbols if symbol in tokens
+        }
+
+        for i, symbol in enumerate(symbols, 1):
+            try:
+                print(f"[{i}/{len(symbols)}] {symbol}...", end=' ', flush=True)
+
+                if symbol not in tasks:
+                    print(f"❌ Not found")
+                    failed += 1
+                    continue
+
+                data = await tasks[symbol]
+
+                if data:
+                    # Parsed and saved on the writer thread while the next symbols
+                    # download; a full queue pauses this loop, not the event loop
+                    await asyncio.to_thread(write_queue.put, (symbol, data))
+                    print(f"✅ {len(data):,} bars")
+                    successful += 1
+                else:
+                    print(f"⚠️  No data")
+                    failed += 1
+
+            except Exception as e:
+                print(f"❌ {str(e)[:40]}")
+                failed += 1
+
+    return successful, failed
+
+
 def main():
     print("\n" + "="*70)
     print("KITE DATA DOWNLOAD")
@@ -53,7 +307,20 @@ def main():
 
     # Create database
     os.makedirs("data_storage/database", exist_ok=True)
-    conn = sqlite3.connect("data_storage/database/tradealgo.db")
+    # Autocommit mode: the download's single transaction is opened/closed explicitly.
+    # Rows are written by the writer thread (the connection is used by one thread at a time)
+    conn = sqlite3.connect("data_storage/database/tradealgo.db", isolation_level=None,
+                           check_same_thread=False)
+    # Bulk-load tuning. WAL + synchronous=NORMAL only fsync at checkpoints: a power
+    # loss can drop the last transactions but never corrupts the file, and the
+    # data can always be downloaded again
+    conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-65536;
+        PRAGMA mmap_size=268435456;
+    """)
     cursor = conn.cursor()
 
     cursor.execute('''
@@ -65,68 +332,42 @@ def main():
             high REAL,
             low REAL,
             close REAL,
-            volume INTEGER,
-            UNIQUE(symbol, datetime)
+            volume INTEGER
         )
     ''')
 
     print("📥 Downloading data...\n")
+    cursor.execute("BEGIN")
+    # First load (empty table): the (symbol, datetime) unique index is dropped and
+    # built once after the rows are in, instead of being updated row by row.
+    # Both happen in the download's transaction, so an interrupted first load
+    # rolls back to the indexed table. Tables created before keep their inline
+    # UNIQUE constraint
+    bulk = prepare_load(cursor)
 
-    successful = 0
-    failed = 0
+    # Instrument dump is downloaded once; only the NSE equity segment's
+    # instrument tokens are kept, keyed by trading symbol
+    tokens = {
+        inst['tradingsymbol']: inst['instrument_token']
+        for inst in kite.instruments("NSE") if inst['segment'] == 'NSE'
+    }
 
-    for i, symbol in enumerate(symbols, 1):
-        try:
-            print(f"[{i}/{len(symbols)}] {symbol}...", end=' ', flush=True)
-            
-            # Get instrument token
-            instruments = kite.instruments("NSE")
-            instrument = next((inst for inst in instruments if inst['tradingsymbol'] == symbol), None)
-            
-            if not instrument:
-                print(f"❌ Not found")
-                failed += 1
-                continue
-            
-            # Fetch 1-minute data
-            data = kite.historical_data(
-                instrument_token=instrument['instrument_token'],
-                from_date=start_date,
-                to_date=end_date,
-                interval="minute"
-            )
-            
-            if data:
-                # Save to database
-                for candle in data:
-                    cursor.execute('''
-                        INSERT OR REPLACE INTO historical_data 
-                        (symbol, datetime, open, high, low, close, volume)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        symbol,
-                        candle['date'].strftime('%Y-%m-%d %H:%M:%S'),
-                        candle['open'],
-                        candle['high'],
-                        candle['low'],
-                        candle['close'],
-                        candle['volume']
-                    ))
-                
-                conn.commit()
-                print(f"✅ {len(data):,} bars")
-                successful += 1
-            else:
-                print(f"⚠️  No data")
-                failed += 1
-            
-            # Rate limiting
-            time.sleep(0.35)
-            
-        except Exception as e:
-            print(f"❌ {str(e)[:40]}")
-            failed += 1
+    write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+    unsaved = []
+    writer = threading.Thread(target=write_candles, args=(cursor, write_queue, unsaved, bulk))
+    writer.start()
+    try:
+        successful, failed = asyncio.run(
+            download_symbols(write_queue, symbols, tokens, start_date, end_date, access_token)
+        )
+    finally:
+        write_queue.put(None)
+        writer.join()
+    successful -= len(unsaved)
+    failed += len(unsaved)
 
+    finish_load(cursor, bulk)
+    cursor.execute("COMMIT")
     conn.close()
 
     print("\n" + "="*70)
@@ -1,6 +1,7 @@
 import docx
 import sys
 import os
+from itertools import chain
 
 def extract_text(path, output_path):
     if not os.path.exists(path):
@@ -9,26 +10,16 @@ def extract_text(path, output_path):
     
     try:
         doc = docx.Document(path)
-        full_text = []
-        
-        # Helper to clean text
-        def clean(t):
-            return t.strip()
-
-        # Extract paragraphs
-        for para in doc.paragraphs:
-            t = clean(para.text)
-            if t:
-                full_text.append(t)
-        
-        # Extract tables (often used for skills/exp in resumes)
-        for table in doc.tables:
-            for row in table.rows:
-                row_data = [clean(cell.text) for cell in row.cells if clean(cell.text)]
-                if row_data:
-                    full_text.append(" | ".join(row_data))
-                    
-        content = '\n'.join(full_text)
+        # Paragraphs, then table rows (often used for skills/exp in resumes);
+        # each paragraph/cell text (an XML walk) is read and stripped once
+        para_lines = (t for t in (para.text.strip() for para in doc.paragraphs) if t)
+        table_lines = (
+            line
+            for table in doc.tables
+            for row in table.rows
+            if (line := " | ".join(t for t in (cell.text.strip() for cell in row.cells) if t))
+        )
+        content = '\n'.join(chain(para_lines, table_lines))
         
         with open(output_path, 'w', encoding='utf-8') as f:
             f.write(content)
@@ -1,6 +1,7 @@
 import docx
 from docx.shared import Pt, Inches, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import nsdecls
 from docx.oxml import parse_xml
 
@@ -12,6 +13,29 @@ def set_cell_background(cell, color_hex):
     shading_elm = parse_xml(r'<w:shd {} w:fill="{}"/>'.format(nsdecls('w'), color_hex))
     cell._tc.get_or_add_tcPr().append(shading_elm)
 
+def add_style(doc, name, style_type=WD_STYLE_TYPE.PARAGRAPH, base='Normal', size=None,
+              bold=None, italic=None, rgb=None, space_before=None, space_after=None):
+    """
+    Add a named style to the document. Paragraphs/runs then reference it
+    (w:pStyle / w:rStyle) instead of each carrying its own formatting.
+    """
+    style = doc.styles.add_style(name, style_type)
+    style.base_style = doc.styles[base]
+    if size is not None:
+        style.font.size = Pt(size)
+    if bold is not None:
+        style.font.bold = bold
+    if italic is not None:
+        style.font.italic = italic
+    if rgb is not None:
+        style.font.color.rgb = RGBColor(*rgb)
+    if style_type == WD_STYLE_TYPE.PARAGRAPH:
+        if space_before is not None:
+            style.paragraph_format.space_before = Pt(space_before)
+        if space_after is not None:
+            style.paragraph_format.space_after = Pt(space_after)
+    return style
+
 def create_resume_docx(filename, profile_data, is_roche=False):
     doc = docx.Document()
     
@@ -23,6 +47,18 @@ def create_resume_docx(filename, profile_data, is_roche=False):
         section.left_margin = Inches(0.5)
         section.right_margin = Inches(0.5)
 
+    # Formatting shared by the repeated sidebar/main paragraphs, defined once
+    sidebar_header_style = add_style(doc, 'Sidebar Header', size=12, bold=True, rgb=(71, 85, 105), # Slate 600
+                                     space_before=12, space_after=6)
+    sidebar_text_style = add_style(doc, 'Sidebar Text', size=9, space_after=3)
+    section_header_style = add_style(doc, 'Section Header', size=12, bold=True, rgb=(30, 41, 59),
+                                     space_before=12, space_after=6)
+    job_title_style = add_style(doc, 'Job Title', size=11)
+    job_company_style = add_style(doc, 'Job Company', WD_STYLE_TYPE.CHARACTER, base='Default Paragraph Font',
+                                  italic=True, rgb=(100, 116, 139))
+    job_date_style = add_style(doc, 'Job Date', size=9, bold=True, rgb=(37, 99, 235), space_after=2)
+    bullet_style = add_style(doc, 'Resume Bullet', base='List Bullet', size=10, space_after=2)
+
     # --- Header ---
     header_table = doc.add_table(rows=1, cols=1)
     header_table.width = Inches(7.5)
@@ -76,24 +112,14 @@ def create_resume_docx(filename, profile_data, is_roche=False):
     lc = left_cell.paragraphs[0]
     
     def add_sidebar_header(text, cell):
-        p = cell.add_paragraph()
-        r = p.add_run(text)
-        r.bold = True
-        r.font.size = Pt(12)
-        r.font.color.rgb = RGBColor(71, 85, 105) # Slate 600
-        p_format = p.paragraph_format
-        p_format.space_before = Pt(12)
-        p_format.space_after = Pt(6)
+        cell.add_paragraph(text, style=sidebar_header_style)
         
     def add_sidebar_text(text, cell, bold=False, icon=""):
-        p = cell.add_paragraph()
+        p = cell.add_paragraph(style=sidebar_text_style)
         if icon:
-            ir = p.add_run(icon + " ")
-            ir.font.size = Pt(9)
+            p.add_run(icon + " ")
         r = p.add_run(text)
         if bold: r.bold = True
-        r.font.size = Pt(9)
-        p.paragraph_format.space_after = Pt(3)
 
     # Contact
     add_sidebar_header("CONTACT", left_cell)
@@ -123,39 +149,20 @@ def create_resume_docx(filename, profile_data, is_roche=False):
     rc = right_cell.paragraphs[0]
     
     def add_section_header(text, cell):
-        p = cell.add_paragraph()
-        r = p.add_run(text.upper())
-        r.bold = True
-        r.font.size = Pt(12)
-        r.font.color.rgb = RGBColor(30, 41, 59)
-        p.paragraph_format.space_before = Pt(12)
-        p.paragraph_format.space_after = Pt(6)
+        cell.add_paragraph(text.upper(), style=section_header_style)
         # Add bottom border simulation if possible? hard in docx. Just keep it simple.
 
     def add_job_header(title, company, date, cell):
-        p = cell.add_paragraph()
-        r1 = p.add_run(title)
-        r1.bold = True
-        r1.font.size = Pt(11)
-        
-        r2 = p.add_run(f" - {company}")
-        r2.italic = True
-        r2.font.size = Pt(11)
-        r2.font.color.rgb = RGBColor(100, 116, 139)
+        p = cell.add_paragraph(style=job_title_style)
+        p.add_run(title).bold = True
+        p.add_run(f" - {company}", style=job_company_style)
 
         # Tab for date or just new line? Tab is better but hard.
         # Let's just put date on next line small.
-        p_date = cell.add_paragraph()
-        r3 = p_date.add_run(date)
-        r3.font.size = Pt(9)
-        r3.bold = True
-        r3.font.color.rgb = RGBColor(37, 99, 235)
-        p_date.paragraph_format.space_after = Pt(2)
+        cell.add_paragraph(date, style=job_date_style)
         
     def add_bullet(text, cell):
-        p = cell.add_paragraph(style='List Bullet')
-        p.add_run(text).font.size = Pt(10)
-        p.paragraph_format.space_after = Pt(2)
+        cell.add_paragraph(text, style=bullet_style)
 
     # Experience Section
     add_section_header("Professional Experience", right_cell)
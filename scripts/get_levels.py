@@ -1,29 +1,47 @@
+import os
+import time
+
 import yfinance as yf
 import numpy as np
 import pandas as pd
 
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data_storage", "cache")
+CACHE_TTL = 300  # seconds; repeated runs within it reuse the last download
+
+def fetch_history(symbol="^NSEI", period="5d", interval="5m"):
+    """
+    Yahoo history for (symbol, period, interval), cached as parquet for CACHE_TTL seconds.
+    """
+    cache_path = os.path.join(CACHE_DIR, f"{symbol.lstrip('^')}_{period}_{interval}.parquet")
+    if os.path.exists(cache_path) and time.time() - os.path.getmtime(cache_path) < CACHE_TTL:
+        try:
+            return pd.read_parquet(cache_path)
+        except ImportError:
+            pass
+    
+    df = yf.Ticker(symbol).history(period=period, interval=interval)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(cache_path)
+    except ImportError:
+        pass  # no parquet engine (pyarrow) installed: download every run
+    return df
+
 def get_levels():
-    ticker = yf.Ticker("^NSEI")
-    df = ticker.history(period="5d", interval="5m")
+    df = fetch_history("^NSEI", period="5d", interval="5m")
     
     # Localize/Remove TZ
     if df.index.tz is not None:
         df.index = df.index.tz_convert('Asia/Kolkata').tz_localize(None)
         
-    df['date'] = df.index.date
-    
-    unique_dates = sorted(df['date'].unique())
-    yesterday_date = unique_dates[-2]
-    today_date = unique_dates[-1]
-    
-    yesterday_df = df[df['date'] == yesterday_date]
-    
-    opens = yesterday_df['Open'].values
-    closes = yesterday_df['Close'].values
-    all_body_values = np.concatenate([opens, closes])
+    # Body high/low per day (keyed by midnight timestamp; keys come out sorted)
+    grouped = df.groupby(df.index.normalize())
+    day_max = np.maximum(grouped['Open'].max(), grouped['Close'].max())
+    day_min = np.minimum(grouped['Open'].min(), grouped['Close'].min())
     
-    prev_day_max = np.max(all_body_values)
-    prev_day_min = np.min(all_body_values)
+    today_date = day_max.index[-1].date()
+    prev_day_max = day_max.iloc[-2]
+    prev_day_min = day_min.iloc[-2]
     range_height = prev_day_max - prev_day_min
     buffer = range_height * 0.05
     
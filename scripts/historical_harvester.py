@@ -1,11 +1,35 @@
 import os
-import time
+import sys
+import shutil
+import tempfile
+import zipfile
 import requests
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from tqdm import tqdm
 from jugaad_data.nse import bhavcopy_fo_save
 from requests.exceptions import ConnectionError
+try:
+    from jugaad_data.holidays import holidays as nse_holidays
+except ImportError:  # older jugaad-data: only weekends are skipped
+    nse_holidays = None
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.rate_limiter import RateLimiter
+
+MAX_WORKERS = 8          # days downloaded concurrently
+REQUESTS_PER_SECOND = 5  # across all workers (the serial loop slept 0.2s per day)
+COPY_BUFSIZE = 64 * 1024
+SPOOL_MAX_SIZE = 8 * 1024 * 1024  # zipped bhavcopies above this spill to a temp file
+
+# Upper-case month names of the NSE archive paths (what strftime("%b").upper()
+# gives in an English locale), looked up by month number
+_MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+# NSE trading holidays (datetime.date), loaded once
+NSE_HOLIDAYS = set(nse_holidays()) if nse_holidays else set()
 
 class HistoricalHarvester:
     def __init__(self, start_date=None, end_year=2016, base_dir="data_archive"):
@@ -19,6 +43,8 @@ class HistoricalHarvester:
         
         self.session = requests.Session()
         self.setup_session()
+        self.limiter = RateLimiter(REQUESTS_PER_SECOND)
+        self._created_dirs = set()  # year/month directories already made
         
         # Create base directory
         if not os.path.exists(self.base_dir):
@@ -43,13 +69,27 @@ class HistoricalHarvester:
     def get_target_path(self, date_obj):
         """Create directory structure and return target file path."""
         year = str(date_obj.year)
-        month = date_obj.strftime("%b").upper() # JAN, FEB, etc.
+        month = _MONTHS[date_obj.month - 1] # JAN, FEB, etc.
         
         dir_path = os.path.join(self.base_dir, year, month)
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path)
+        # One makedirs per month rather than per day; exist_ok covers workers of
+        # the same month racing here
+        if dir_path not in self._created_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self._created_dirs.add(dir_path)
             
-        return os.path.join(dir_path, f"fo_{date_obj.strftime('%d%m%Y')}.csv")
+        return os.path.join(dir_path, f"fo_{date_obj.day:02d}{date_obj.month:02d}{date_obj.year}.parquet")
+
+    def save_parquet(self, csv_path, target_path):
+        """Convert a downloaded bhavcopy CSV to zstd Parquet and drop the CSV."""
+        # Parsed once here instead of on every downstream read; columnar + zstd is
+        # also several times smaller on disk
+        df = pd.read_csv(csv_path)
+        try:
+            df.to_parquet(target_path, compression='zstd', index=False)
+        except ImportError:
+            return  # no parquet engine (pyarrow) installed: keep the CSV
+        os.remove(csv_path)
 
     def download_legacy(self, date_obj, output_path):
         """Fallback method for older data using direct requests to archives."""
@@ -57,9 +97,9 @@ class HistoricalHarvester:
         # Or csv directly depending on the era. 
         # Note: NSE archives often provide zip files for older data.
         
-        year = date_obj.strftime("%Y")
-        month = date_obj.strftime("%b").upper()
-        date_str = date_obj.strftime("%d%b%Y").upper()
+        year = date_obj.year
+        month = _MONTHS[date_obj.month - 1]
+        date_str = f"{date_obj.day:02d}{month}{year}"
         
         # Try CSV first, then ZIP
         filenames = [
@@ -72,89 +112,82 @@ class HistoricalHarvester:
         for filename in filenames:
             url = base_url + filename
             try:
-                response = self.session.get(url, timeout=10)
-                if response.status_code == 200:
-                    # If zip, we might need to unzip, but for now let's save what we get
-                    # If the user wants strictly CSV, we might need to unzip.
-                    # jugaad-data handles unzip automatically.
-                    
-                    # For simplicity in this fallback, if it's a zip, we save it as zip, 
-                    # but the requirement says "fo_{date}.csv". 
-                    # Let's try to handle zip extraction if needed, or just save content.
-                    
-                    if filename.endswith('.zip'):
-                        import zipfile
-                        import io
-                        with zipfile.ZipFile(io.BytesIO(response.content)) as z:
-                            # Assume the csv is inside with the same name pattern
-                            csv_name = z.namelist()[0]
-                            with z.open(csv_name) as f:
-                                content = f.read()
-                                with open(output_path, 'wb') as out_f:
-                                    out_f.write(content)
-                    else:
-                        with open(output_path, 'wb') as f:
-                            f.write(response.content)
-                    return True
-                elif response.status_code == 404:
-                    continue # Try next filename or return False
+                self.limiter.wait()
+                # Streamed: the body is copied to disk in chunks, never held whole
+                with self.session.get(url, timeout=10, stream=True) as response:
+                    if response.status_code == 200:
+                        # If zip, we might need to unzip, but for now let's save what we get
+                        # If the user wants strictly CSV, we might need to unzip.
+                        # jugaad-data handles unzip automatically.
+                        
+                        # For simplicity in this fallback, if it's a zip, we save it as zip, 
+                        # but the requirement says "fo_{date}.csv". 
+                        # Let's try to handle zip extraction if needed, or just save content.
+                        
+                        response.raw.decode_content = True  # undo gzip/deflate Content-Encoding
+                        if filename.endswith('.zip'):
+                            # ZipFile needs a seekable file (its index is at the end of the
+                            # archive), so the compressed download is spooled first
+                            with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+                                shutil.copyfileobj(response.raw, spool, COPY_BUFSIZE)
+                                with zipfile.ZipFile(spool) as z:
+                                    # Assume the csv is inside with the same name pattern
+                                    csv_name = z.namelist()[0]
+                                    with z.open(csv_name) as f, open(output_path, 'wb') as out_f:
+                                        shutil.copyfileobj(f, out_f, COPY_BUFSIZE)
+                        else:
+                            with open(output_path, 'wb') as f:
+                                shutil.copyfileobj(response.raw, f, COPY_BUFSIZE)
+                        return True
+                    elif response.status_code == 404:
+                        continue # Try next filename or return False
             except Exception as e:
                 print(f"Legacy download error for {date_obj}: {e}")
         
         return False
 
-    def run(self):
-        consecutive_failures = 0
-        requests_count = 0
+    def fetch_one(self, date_obj):
+        """
+        Download one day's bhavcopy to its target (Parquet) path (runs on a worker thread).
+        Returns True if the file exists afterwards.
+        """
+        target_path = self.get_target_path(date_obj)
+        csv_path = target_path[:-len('.parquet')] + '.csv'
         
-        print(f"Starting harvest from {self.current_date} backwards to {self.end_year}...")
-        
-        # Create a progress bar roughly estimating days
-        days_total = (self.current_date - datetime(self.end_year, 1, 1).date()).days
-        pbar = tqdm(total=days_total)
+        # Skip if already exists
+        if os.path.exists(target_path):
+            return True
         
-        while self.current_date.year >= self.end_year:
-            if consecutive_failures >= 10:
-                print("Too many consecutive failures. Stopping.")
-                break
-                
-            target_path = self.get_target_path(self.current_date)
-            
-            # Skip if already exists
-            if os.path.exists(target_path):
-                # print(f"Skipping {self.current_date}, already exists.")
-                self.current_date -= timedelta(days=1)
-                pbar.update(1)
-                consecutive_failures = 0 # Reset on existing file? Or keep counting? 
-                # Usually if it exists, it's a success.
-                continue
-            
-            success = False
-            try:
+        # CSVs saved by earlier harvests only need converting
+        success = os.path.exists(csv_path)
+        try:
+            if not success:
                 # 1. Try jugaad-data first
                 # bhavcopy_fo_save returns the path of the saved file
                 # It saves to the directory provided.
                 output_dir = os.path.dirname(target_path)
-                
+            
                 # jugaad-data saves with a specific name, we might need to rename it
                 # or just let it save and then rename.
                 # It usually saves as fo<dd><MMM><yyyy>bhav.csv
-                
+                # (one file per date, so concurrent workers never write the same file)
+            
                 try:
-                    saved_path = bhavcopy_fo_save(self.current_date, output_dir)
-                    
+                    self.limiter.wait()
+                    saved_path = bhavcopy_fo_save(date_obj, output_dir)
+                
                     # Rename to our standard fo_{date}.csv
                     if os.path.exists(saved_path):
                         # If saved_path is not target_path, rename
                         # But wait, we want to control the filename.
                         # jugaad-data doesn't let us control filename easily in the function call,
                         # it returns the path it saved to.
-                        
+                    
                         # We can read it and write to our target path, or move it.
                         # Let's move it.
-                        os.replace(saved_path, target_path)
+                        os.replace(saved_path, csv_path)
                         success = True
-                        
+                    
                 except Exception as e:
                     # jugaad-data failed, maybe 404 or other error
                     # If it's a holiday, it might raise an error or just print.
@@ -162,33 +195,59 @@ class HistoricalHarvester:
                     # But for recent years, jugaad-data is best.
                     pass
 
-                # 2. Fallback to legacy if jugaad failed
-                if not success:
-                    success = self.download_legacy(self.current_date, target_path)
+            # 2. Fallback to legacy if jugaad failed
+            if not success:
+                success = self.download_legacy(date_obj, csv_path)
+            
+            if success:
+                self.save_parquet(csv_path, target_path)
+        
+        except Exception as e:
+            print(f"Error processing {date_obj}: {e}")
+            success = False
+        
+        return success
 
-                if success:
-                    consecutive_failures = 0
-                else:
-                    # Likely a holiday or weekend
-                    # print(f"No Data (Holiday/Fail) for {self.current_date}")
-                    consecutive_failures += 1
+    def run(self):
+        consecutive_failures = 0
+        requests_count = 0
+        
+        print(f"Starting harvest from {self.current_date} backwards to {self.end_year}...")
+        
+        # All target trading dates up front, newest first. Weekends and known
+        # holidays have no bhavcopy: they are never requested and so never count
+        # towards the consecutive-failure stop
+        days_total = (self.current_date - datetime(self.end_year, 1, 1).date()).days + 1
+        dates = [d for d in (self.current_date - timedelta(days=i) for i in range(days_total))
+                 if d.weekday() < 5 and d not in NSE_HOLIDAYS]
+        pbar = tqdm(total=len(dates))
+        
+        # Days are fetched concurrently (paced by self.limiter); results come back
+        # in date order, so the consecutive-failure stop still sees the same sequence
+        executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        for date_obj, success in zip(dates, executor.map(self.fetch_one, dates)):
+            self.current_date = date_obj
             
-            except Exception as e:
-                print(f"Error processing {self.current_date}: {e}")
+            if success:
+                consecutive_failures = 0
+            else:
+                # Likely an unlisted holiday
+                # print(f"No Data (Holiday/Fail) for {date_obj}")
                 consecutive_failures += 1
             
-            # Rate limiting and Session Management
+            # Session Management (workers pick up the new session on their next request)
             requests_count += 1
             if requests_count >= 100:
                 self.setup_session()
                 requests_count = 0
-                time.sleep(1) # Extra pause on re-init
-            
-            time.sleep(0.2)
             
-            self.current_date -= timedelta(days=1)
             pbar.update(1)
             
+            if consecutive_failures >= 10:
+                print("Too many consecutive failures. Stopping.")
+                break
+        
+        executor.shutdown(cancel_futures=True)
         pbar.close()
         print("Harvest complete.")
 
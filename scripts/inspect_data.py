@@ -5,10 +5,12 @@ def inspect_zip(zip_path):
     print(f"Inspecting {zip_path}...")
     try:
         with zipfile.ZipFile(zip_path, 'r') as z:
-            print(f"Files found: {len(z.namelist())}")
+            # One member list (namelist() builds a new one per call)
+            infos = z.infolist()
+            print(f"Files found: {len(infos)}")
             print("First 10 files:")
-            for name in z.namelist()[:10]:
-                print(f" - {name}")
+            for info in infos[:10]:
+                print(f" - {info.filename}")
     except Exception as e:
         print(f"Error reading {zip_path}: {e}")
 
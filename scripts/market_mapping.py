@@ -1,128 +1,272 @@
 import pandas as pd
+import numpy as np
 import yfinance as yf
 import os
 import glob
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pac
+    import pyarrow.dataset as pads
+    import pyarrow.parquet as pq
+except ImportError:  # pandas' own CSV parser is used instead; no Parquet dataset
+    pac = None
+
 # Configuration
 INDEX_DIR = r"C:\Users\atuls\Startup\TradeAlgo\kaggle_data\archive"
 STOCK_DIR = r"C:\Users\atuls\Startup\TradeAlgo\kaggle_data\minute\minute"
+# STOCK_DIR converted once (--convert) to Parquet partitioned by symbol
+STOCK_DATASET_DIR = r"C:\Users\atuls\Startup\TradeAlgo\kaggle_data\minute_parquet"
 OUTPUT_FILE = "master_mapping.csv"
+MCAP_WORKERS = 8  # concurrent Yahoo market-cap batches
+MCAP_BATCH = 20   # symbols per yf.Tickers batch
+MCAP_CACHE_FILE = "mcap_cache.parquet"
+MCAP_MAX_AGE_DAYS = 7  # market caps move slowly; cached ones are reused this long
+
+def read_close(filepath):
+    """
+    Reads a minute CSV's close prices as a Series indexed by tz-naive datetime,
+    or None if the file has no 'date' column.
+    """
+    if pac is not None:
+        # Multithreaded parse of only the two columns needed; dates stay strings
+        # here and are parsed below exactly as pandas would
+        try:
+            table = pac.read_csv(filepath, convert_options=pac.ConvertOptions(
+                include_columns=['date', 'close'], column_types={'date': pa.string()}))
+        except KeyError:  # column not in the file
+            return None
+        df = table.to_pandas()
+    else:
+        df = pd.read_csv(filepath, usecols=lambda c: c in ('date', 'close'))
+        if 'date' not in df.columns:
+            return None
+
+    # Standardize date column
+    df['date'] = pd.to_datetime(df['date'])
+    # Ensure timezone naive for alignment
+    if df['date'].dt.tz is not None:
+        df['date'] = df['date'].dt.tz_localize(None)
+    return df.set_index('date')['close']
+
+def csv_to_parquet(dir_in, dir_out):
+    """
+    Converts every stock CSV in dir_in into one Parquet dataset at dir_out,
+    partitioned by symbol (dir_out/symbol=<SYMBOL>/...), snappy-compressed.
+    Dates are stored parsed and tz-naive, as read_close() returns them.
+    """
+    stock_files = glob.glob(os.path.join(dir_in, "*.csv"))
+    print(f"Converting {len(stock_files)} stock CSVs to {dir_out}...")
+    for filepath in tqdm(stock_files):
+        symbol = os.path.basename(filepath).replace(".csv", "")
+        try:
+            df = pac.read_csv(filepath, convert_options=pac.ConvertOptions(
+                column_types={'date': pa.string()})).to_pandas()
+            df['date'] = pd.to_datetime(df['date'])
+            if df['date'].dt.tz is not None:
+                df['date'] = df['date'].dt.tz_localize(None)
+            df['symbol'] = symbol
+            # Re-converting a symbol replaces its partition instead of adding files
+            pq.write_to_dataset(pa.Table.from_pandas(df, preserve_index=False), root_path=dir_out,
+                                partition_cols=['symbol'], compression='snappy',
+                                existing_data_behavior='delete_matching')
+        except Exception as e:
+            print(f"Error converting {symbol}: {e}")
+
+def stock_dataset(dataset_dir):
+    """The symbol-partitioned Parquet dataset at dataset_dir, or None if absent."""
+    if pac is None or not os.path.isdir(dataset_dir):
+        return None
+    partitioning = pads.partitioning(pa.schema([('symbol', pa.string())]), flavor='hive')
+    return pads.dataset(dataset_dir, format='parquet', partitioning=partitioning)
 
 def load_indices(index_dir):
-    """Loads all index CSVs into a dictionary of DataFrames."""
+    """Loads all index CSVs into one DataFrame of close prices (a column per index)."""
     indices = {}
     print("Loading Indices...")
     for filepath in glob.glob(os.path.join(index_dir, "*.csv")):
         filename = os.path.basename(filepath)
         index_name = filename.replace("_minute.csv", "")
         try:
-            df = pd.read_csv(filepath)
-            # Standardize date column
-            if 'date' in df.columns:
-                df['date'] = pd.to_datetime(df['date'])
-                # Ensure timezone naive for alignment
-                if df['date'].dt.tz is not None:
-                    df['date'] = df['date'].dt.tz_localize(None)
-                df.set_index('date', inplace=True)
-                indices[index_name] = df['close'] # We only need close price for correlation
+            close = read_close(filepath) # We only need close price for correlation
+            if close is not None:
+                indices[index_name] = close
             else:
                 print(f"Warning: 'date' column not found in {filename}")
         except Exception as e:
             print(f"Error loading {filename}: {e}")
     print(f"Loaded {len(indices)} indices.")
-    return indices
+    if not indices:
+        return pd.DataFrame()
+    # One wide frame (outer-joined on timestamp), aligned once for all stocks
+    return pd.concat(indices, axis=1).sort_index()
 
-def get_market_cap_category(symbol):
-    """Fetches market cap and returns category."""
-    try:
+def best_correlated_index(stock_close, idx_df, min_overlap=100):
+    """
+    Pearson correlation of stock_close with every index column, each over the
+    timestamps where both have a price (as Series.corr on the pair would).
+    Returns (index_name, corr) of the most correlated index with at least
+    min_overlap common points, or (None, -1.0) if there is none.
+    """
+    aligned = idx_df.join(stock_close.rename('__stock__'), how='inner')
+    y = aligned.pop('__stock__').to_numpy(dtype=np.float64)
+    x = aligned.to_numpy(dtype=np.float64)
+
+    y_valid = ~np.isnan(y)
+    valid = ~np.isnan(x) & y_valid[:, None]
+    n = valid.sum(axis=0)
+
+    # Centre on the means (keeps the moment sums below well conditioned), then
+    # zero the missing points so they drop out of every sum
+    y = np.where(y_valid, y - y[y_valid].mean() if y_valid.any() else 0.0, 0.0)
+    x = np.where(valid, x, 0.0)
+    x = np.where(valid, x - x.sum(axis=0) / np.maximum(n, 1), 0.0)
+
+    # Per-column moments over each column's own valid rows: matrix products
+    # instead of one aligned frame and correlation per index
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = x.sum(axis=0) / n
+        mean_y = (y @ valid) / n
+        cov = (y @ x) / n - mean_x * mean_y
+        var_x = np.einsum('tk,tk->k', x, x) / n - mean_x ** 2
+        var_y = ((y * y) @ valid) / n - mean_y ** 2
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[n < min_overlap] = np.nan
+
+    if np.isnan(corr).all():
+        return None, -1.0
+    best = np.nanargmax(corr)  # first of equal maxima, as the per-index loop kept
+    return aligned.columns[best], corr[best]
+
+def fetch_market_caps(symbols, batch=MCAP_BATCH):
+    """
+    Fetches market caps for NSE symbols in batches of yf.Tickers, the batches
+    running concurrently. Returns {symbol: market cap or None}; symbols whose
+    lookup failed are left out.
+    """
+    def fetch_batch(chunk):
         # Assuming NSE symbols, append .NS if not present in filename logic
         # The filenames are like '20MICRONS.csv', so symbol is '20MICRONS'
         # yfinance expects '20MICRONS.NS' for NSE
-        ticker_symbol = f"{symbol}.NS"
-        ticker = yf.Ticker(ticker_symbol)
-        market_cap = ticker.info.get('marketCap')
-
-        if market_cap is None:
-            return "Unknown"
-
-        # Convert to Billions (INR) - yfinance returns in actual currency units
-        # Assuming INR for .NS stocks. 
-        # 1 Billion = 1,000,000,000
-        mcap_billions = market_cap / 1_000_000_000
-
-        if mcap_billions >= 200:
-            return "Large Cap"
-        elif 50 <= mcap_billions < 200:
-            return "Mid Cap"
-        elif 5 <= mcap_billions < 50:
-            return "Small Cap"
-        else:
-            return "Micro Cap" # < 5 Billion
-            
-    except Exception as e:
-        # print(f"Error fetching market cap for {symbol}: {e}")
-        return "Error"
-
-def process_stocks(stock_dir, indices, limit=None):
-    """Iterates through stocks and calculates correlation."""
+        tickers = yf.Tickers(" ".join(f"{symbol}.NS" for symbol in chunk))
+        caps = {}
+        for symbol in chunk:
+            try:
+                # fast_info: the light quote lookup instead of the full .info summary
+                caps[symbol] = tickers.tickers[f"{symbol}.NS".upper()].fast_info['marketCap']
+            except Exception as e:
+                # print(f"Error fetching market cap for {symbol}: {e}")
+                pass
+        return caps
+
+    chunks = [symbols[i:i + batch] for i in range(0, len(symbols), batch)]
+    market_caps = {}
+    with ThreadPoolExecutor(max_workers=MCAP_WORKERS) as executor:
+        for caps in tqdm(executor.map(fetch_batch, chunks), total=len(chunks)):
+            market_caps.update(caps)
+    return market_caps
+
+def load_market_caps(symbols, cache_path=MCAP_CACHE_FILE, max_age_days=MCAP_MAX_AGE_DAYS):
+    """
+    fetch_market_caps() through an on-disk cache: only symbols missing from the
+    cache or fetched more than max_age_days ago go to Yahoo.
+    """
+    today = pd.Timestamp.today().normalize()
+    try:
+        cache = pd.read_parquet(cache_path)
+    except (FileNotFoundError, ImportError):
+        cache = pd.DataFrame({'market_cap': pd.Series(dtype='float64'),
+                              'fetched_on': pd.Series(dtype='datetime64[ns]')},
+                             index=pd.Index([], name='symbol', dtype='object'))
+
+    fresh = cache[(today - cache['fetched_on']).dt.days <= max_age_days]
+    to_fetch = [symbol for symbol in symbols if symbol not in fresh.index]
+    if to_fetch:
+        print(f"Fetching market caps for {len(to_fetch)} stocks ({len(symbols) - len(to_fetch)} cached)...")
+        fetched = fetch_market_caps(to_fetch)
+        if fetched:
+            new = pd.DataFrame({'market_cap': pd.Series(fetched, dtype='float64'), 'fetched_on': today})
+            new.index.name = 'symbol'
+            cache = pd.concat([cache[~cache.index.isin(new.index)], new])
+            try:
+                cache.to_parquet(cache_path, compression='snappy')
+            except ImportError:
+                pass  # no parquet engine (pyarrow) installed: fetch every run
+
+    # Failed lookups are not cached (left out); a failed refresh keeps the old value
+    market_caps = cache.loc[cache.index.intersection(symbols), 'market_cap']
+    return {symbol: (None if pd.isna(cap) else cap) for symbol, cap in market_caps.items()}
+
+def get_market_cap_category(market_cap):
+    """Returns the category of a market cap (None: unknown)."""
+    if market_cap is None:
+        return "Unknown"
+
+    # Convert to Billions (INR) - yfinance returns in actual currency units
+    # Assuming INR for .NS stocks. 
+    # 1 Billion = 1,000,000,000
+    mcap_billions = market_cap / 1_000_000_000
+
+    if mcap_billions >= 200:
+        return "Large Cap"
+    elif 50 <= mcap_billions < 200:
+        return "Mid Cap"
+    elif 5 <= mcap_billions < 50:
+        return "Small Cap"
+    else:
+        return "Micro Cap" # < 5 Billion
+
+def process_stocks(stock_dir, idx_df, limit=None, dataset=None):
+    """
+    Iterates through stocks and calculates correlation. With a Parquet dataset
+    (see csv_to_parquet) stocks are read from it instead of stock_dir's CSVs.
+    """
     results = []
-    stock_files = glob.glob(os.path.join(stock_dir, "*.csv"))
+    if dataset is not None:
+        # Symbols from the partition paths; each read projects date/close and
+        # prunes to the symbol's partition
+        symbols = sorted({pads.get_partition_keys(fragment.partition_expression)['symbol']
+                          for fragment in dataset.get_fragments()})
+
+        def load_close(symbol):
+            table = dataset.to_table(columns=['date', 'close'], filter=pads.field('symbol') == symbol)
+            return table.to_pandas().set_index('date')['close']
+    else:
+        symbols = [os.path.basename(filepath).replace(".csv", "")
+                   for filepath in glob.glob(os.path.join(stock_dir, "*.csv"))]
+
+        def load_close(symbol):
+            return read_close(os.path.join(stock_dir, f"{symbol}.csv"))
     
     if limit:
-        stock_files = stock_files[:limit]
+        symbols = symbols[:limit]
         print(f"Processing limited subset: {limit} stocks")
 
-    print(f"Processing {len(stock_files)} stocks...")
+    print(f"Processing {len(symbols)} stocks...")
 
-    for filepath in tqdm(stock_files):
-        symbol = os.path.basename(filepath).replace(".csv", "")
-        
+    for symbol in tqdm(symbols):
         try:
-            df = pd.read_csv(filepath)
-            if 'date' not in df.columns:
+            # Timezone info removed to match indices (which we made naive)
+            stock_close = load_close(symbol)
+            if stock_close is None:
                 print(f"Skipping {symbol}: No 'date' column")
                 continue
-                
-            df['date'] = pd.to_datetime(df['date'])
-            # Remove timezone info to match indices (which we made naive)
-            if df['date'].dt.tz is not None:
-                df['date'] = df['date'].dt.tz_localize(None)
-            
-            df.set_index('date', inplace=True)
-            stock_close = df['close']
-
-            max_corr = -1.0
-            best_sector = "Unassigned"
-
-            # Calculate correlation with each index
-            for index_name, index_close in indices.items():
-                # Align data
-                aligned_data = pd.concat([stock_close, index_close], axis=1, join='inner')
-                
-                # Check for sufficient overlap
-                if len(aligned_data) < 100: # Minimum 100 data points overlap
-                    continue
-                
-                corr = aligned_data.iloc[:, 0].corr(aligned_data.iloc[:, 1])
-                
-                if corr > max_corr:
-                    max_corr = corr
-                    best_sector = index_name
+
+            # Correlation with every index at once (minimum 100 data points overlap)
+            best_sector, max_corr = best_correlated_index(stock_close, idx_df, min_overlap=100)
 
             # Apply threshold
-            if max_corr < 0.4:
+            if best_sector is None or max_corr < 0.4:
                 best_sector = "Unassigned"
 
-            # Get Market Cap
-            cap_category = get_market_cap_category(symbol)
-
             results.append({
                 "Symbol": symbol,
                 "Sector": best_sector,
                 "Correlation": round(max_corr, 4) if max_corr != -1.0 else 0.0,
-                "Cap_Category": cap_category
+                "Cap_Category": None  # filled in by the market-cap pass below
             })
 
         except Exception as e:
@@ -134,19 +278,36 @@ def process_stocks(stock_dir, indices, limit=None):
                 "Cap_Category": "Error"
             })
 
+    # Get Market Cap: network-bound, so batched lookups run on a thread pool
+    pending = [row for row in results if row["Cap_Category"] is None]
+    market_caps = load_market_caps([row["Symbol"] for row in pending])
+    for row in pending:
+        if row["Symbol"] in market_caps:
+            row["Cap_Category"] = get_market_cap_category(market_caps[row["Symbol"]])
+        else:
+            row["Cap_Category"] = "Error"
+
     return pd.DataFrame(results)
 
 def main():
     parser = argparse.ArgumentParser(description="Market Mapping Script")
     parser.add_argument("--limit", type=int, help="Limit number of stocks to process for testing", default=None)
+    parser.add_argument("--convert", action="store_true",
+                        help="Convert the stock CSVs to a Parquet dataset (needs pyarrow) before mapping")
     args = parser.parse_args()
 
-    indices = load_indices(INDEX_DIR)
-    if not indices:
+    if args.convert:
+        if pac is None:
+            print("pyarrow is required for --convert.")
+            return
+        csv_to_parquet(STOCK_DIR, STOCK_DATASET_DIR)
+
+    idx_df = load_indices(INDEX_DIR)
+    if idx_df.empty:
         print("No indices loaded. Exiting.")
         return
 
-    df_results = process_stocks(STOCK_DIR, indices, limit=args.limit)
+    df_results = process_stocks(STOCK_DIR, idx_df, limit=args.limit, dataset=stock_dataset(STOCK_DATASET_DIR))
     
     df_results.to_csv(OUTPUT_FILE, index=False)
     print(f"Mapping completed. Saved to {OUTPUT_FILE}")
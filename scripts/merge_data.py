@@ -1,8 +1,46 @@
 import os
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pac
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm
 import glob
 
+def _read_and_filter(file_path):
+    """
+    Read one bhavcopy (Parquet or CSV) as an Arrow table of its NIFTY/BANKNIFTY
+    index options, with standard column names. Returns None if there are none
+    or the file can't be read. Module-level so process pool workers can run it.
+    """
+    try:
+        if file_path.endswith('.parquet'):
+            table = pq.read_table(file_path)
+        else:
+            table = pac.read_csv(file_path)
+        
+        # Standardize first to get consistent names
+        table = DataMerger.standardize_columns(table)
+        
+        # Filter
+        if 'Instrument' not in table.column_names or 'Symbol' not in table.column_names:
+            return None
+        mask = pc.and_(pc.equal(table['Instrument'], 'OPTIDX'),
+                       pc.is_in(table['Symbol'], value_set=pa.array(['NIFTY', 'BANKNIFTY'])))
+        table = table.filter(mask)
+        if table.num_rows == 0:
+            return None
+        
+        # Convert Date to datetime if needed (per file: the date format varies across eras)
+        if 'Date' in table.column_names:
+            dates = pd.to_datetime(table['Date'].to_pandas())
+            table = table.set_column(table.column_names.index('Date'), 'Date', pa.Array.from_pandas(dates))
+        return table
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+
 class DataMerger:
     def __init__(self, base_dir="data_archive", output_dir="data_storage"):
         self.base_dir = base_dir
@@ -10,10 +48,11 @@ class DataMerger:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def standardize_columns(self, df):
-        """Map columns to standard format."""
+    @staticmethod
+    def standardize_columns(table):
+        """Map columns of an Arrow table to standard format."""
         # Normalize columns to uppercase
-        df.columns = [c.strip().upper() for c in df.columns]
+        names = [c.strip().upper() for c in table.column_names]
         
         # Mapping dictionary
         # Handle variations like 'OPEN_INT' vs 'OI', 'CONTRACTS' vs 'VOLUME'
@@ -37,15 +76,17 @@ class DataMerger:
             'SYMBOL': 'Symbol'
         }
         
-        df = df.rename(columns=column_map)
+        names = [column_map.get(c, c) for c in names]
+        table = table.rename_columns(names)
         
         # Ensure we have all required columns
         required_cols = ['Date', 'ExpiryDate', 'OptionType', 'StrikePrice', 'Open', 'High', 'Low', 'Close', 'OI', 'Volume', 'Instrument', 'Symbol']
         
         # Filter for only existing required columns (some might be missing in very old files, but usually these exist)
-        available_cols = [c for c in required_cols if c in df.columns]
+        # (by position: the first one wins if two source columns map to the same name)
+        available_cols = [names.index(c) for c in required_cols if c in names]
         
-        return df[available_cols]
+        return table.select(available_cols)
 
     def process_year(self, year):
         print(f"Processing data for year {year}...")
@@ -54,43 +95,32 @@ class DataMerger:
             print(f"No data found for year {year}")
             return
 
-        all_files = glob.glob(os.path.join(year_path, "**", "*.csv"), recursive=True)
+        # Bhavcopies are saved as Parquet; older harvests left CSVs
+        all_files = (glob.glob(os.path.join(year_path, "**", "*.parquet"), recursive=True)
+                     + glob.glob(os.path.join(year_path, "**", "*.csv"), recursive=True))
         if not all_files:
-            print(f"No CSV files found for year {year}")
+            print(f"No bhavcopy files found for year {year}")
             return
 
-        daily_dfs = []
-        for file_path in tqdm(all_files, desc=f"Reading {year}"):
-            try:
-                df = pd.read_csv(file_path)
-                
-                # Standardize first to get consistent names
-                df = self.standardize_columns(df)
-                
-                # Filter
-                if 'Instrument' in df.columns and 'Symbol' in df.columns:
-                    mask = (df['Instrument'] == 'OPTIDX') & (df['Symbol'].isin(['NIFTY', 'BANKNIFTY']))
-                    filtered_df = df[mask].copy()
-                    
-                    if not filtered_df.empty:
-                        # Convert Date to datetime if needed
-                        if 'Date' in filtered_df.columns:
-                            filtered_df['Date'] = pd.to_datetime(filtered_df['Date'])
-                        
-                        daily_dfs.append(filtered_df)
-            except Exception as e:
-                print(f"Error reading {file_path}: {e}")
+        # Files are parsed in parallel worker processes (CPU-bound); each day
+        # stays an Arrow table, and concat_tables only stitches their chunks
+        with ProcessPoolExecutor() as executor:
+            tables = [t for t in tqdm(executor.map(_read_and_filter, all_files), total=len(all_files),
+                                      desc=f"Reading {year}")
+                      if t is not None]
 
-        if daily_dfs:
-            print(f"Merging {len(daily_dfs)} files for {year}...")
-            full_df = pd.concat(daily_dfs, ignore_index=True)
+        if tables:
+            print(f"Merging {len(tables)} files for {year}...")
+            # Permissive promotion unifies columns missing in some eras and int/float drift
+            full_table = pa.concat_tables(tables, promote_options="permissive")
             
             # Sort
-            full_df = full_df.sort_values(by=['Date', 'Symbol', 'ExpiryDate', 'StrikePrice'])
+            full_table = full_table.sort_by([(c, 'ascending') for c in ['Date', 'Symbol', 'ExpiryDate', 'StrikePrice']
+                                             if c in full_table.column_names])
             
             # Save to Parquet
             output_path = os.path.join(self.output_dir, f"nifty_options_{year}.parquet")
-            full_df.to_parquet(output_path, index=False)
+            pq.write_table(full_table, output_path, compression='snappy')
             print(f"Saved {output_path}")
         else:
             print(f"No valid data found for {year}")
@@ -1,12 +1,29 @@
 import pandas as pd
 import numpy as np
 import os
+from numba import njit
+
+# Trade scan results: direction and exit reason codes (NO_EXIT: held to EOD)
+LONG, NO_TRADE, SHORT = 1, 0, -1
+NO_EXIT, TARGET, STOP_LOSS = 0, 1, 2
+EXIT_REASONS = {TARGET: 'TARGET', STOP_LOSS: 'STOP_LOSS'}
 
 def load_and_preprocess_data(file_path):
     """
     Loads Nifty 50 minute data, resamples to 5-minute candles, and filters for market hours.
+    The result is cached next to the CSV (<name>_5min.parquet) and reused while newer than it.
     """
     print(f"Loading data from: {file_path}")
+    cache_path = file_path.replace('.csv', '_5min.parquet')
+    if (os.path.exists(file_path) and os.path.exists(cache_path)
+            and os.path.getmtime(cache_path) > os.path.getmtime(file_path)):
+        try:
+            df_5min = pd.read_parquet(cache_path)
+            print(f"Loaded cached 5min data. Shape: {df_5min.shape}")
+            return df_5min
+        except ImportError:
+            pass  # no parquet engine (pyarrow) installed: rebuild from the CSV
+
     try:
         df = pd.read_csv(file_path)
     except FileNotFoundError:
@@ -43,16 +60,19 @@ def load_and_preprocess_data(file_path):
     # Let's strictly keep candles where the time part is >= 09:15 and <= 15:25 (start time)
     # Or simply filter by time.
     
-    df_5min['time'] = df_5min.index.time
-    market_start = pd.to_datetime("09:15:00").time()
-    market_end = pd.to_datetime("15:25:00").time() # Last candle starts at 15:25 and ends at 15:30
+    # Minute of day straight from the DatetimeIndex (integer compares, no datetime.time objects)
+    minute_of_day = df_5min.index.hour * 60 + df_5min.index.minute
+    market_start = 9 * 60 + 15 # 09:15
+    market_end = 15 * 60 + 25 # Last candle starts at 15:25 and ends at 15:30
     
-    df_5min = df_5min[(df_5min['time'] >= market_start) & (df_5min['time'] <= market_end)].copy()
-    
-    # Drop the temporary time column
-    df_5min.drop(columns=['time'], inplace=True)
+    df_5min = df_5min[(minute_of_day >= market_start) & (minute_of_day <= market_end)].copy()
     
     print(f"Data loaded and resampled. Shape: {df_5min.shape}")
+    if cache_path != file_path:
+        try:
+            df_5min.to_parquet(cache_path, compression='snappy')
+        except ImportError:
+            pass  # no parquet engine (pyarrow) installed: skip the cache
     return df_5min
 
 def calculate_daily_stats(df_5min):
@@ -62,30 +82,16 @@ def calculate_daily_stats(df_5min):
     # Create a column for just the date
     df_5min['date_only'] = df_5min.index.date
     
-    daily_stats = []
-    
-    # Group by date
-    grouped = df_5min.groupby('date_only')
-    
-    for date, group in grouped:
-        # Calculate PrevDay_Max and PrevDay_Min using only Open and Close
-        # We flatten Open and Close columns to find global max/min for that day's bodies
-        opens = group['open'].values
-        closes = group['close'].values
-        all_body_values = np.concatenate([opens, closes])
-        
-        day_max = np.max(all_body_values)
-        day_min = np.min(all_body_values)
-        
-        daily_stats.append({
-            'date': date,
-            'day_max': day_max,
-            'day_min': day_min
-        })
-        
-    stats_df = pd.DataFrame(daily_stats)
-    stats_df.set_index('date', inplace=True)
-    stats_df.sort_index(inplace=True)
+    # Body high/low of each day (Open and Close only): C-level groupby
+    # reductions per column, combined element-wise (keys come out sorted)
+    daily = df_5min.groupby('date_only').agg(
+        open_max=('open', 'max'), open_min=('open', 'min'),
+        close_max=('close', 'max'), close_min=('close', 'min'))
+    stats_df = pd.DataFrame({
+        'day_max': np.maximum(daily['open_max'], daily['close_max']),
+        'day_min': np.minimum(daily['open_min'], daily['close_min'])
+    })
+    stats_df.index.name = 'date'
     
     # Calculate previous day values (shift by 1)
     stats_df['prev_day_max'] = stats_df['day_max'].shift(1)
@@ -126,6 +132,77 @@ def classify_day(open_price, close_price, support, resistance):
         
     return start_state, end_state
 
+@njit(cache=True)
+def _scan_breakout(highs, lows, target, stop_loss, direction):
+    """
+    Scans the candles after the opening one for the breakout trade's exit.
+    Returns (exit_price, reason); reason NO_EXIT if neither level was hit.
+    """
+    for i in range(1, highs.shape[0]):
+        if direction == LONG:
+            if highs[i] >= target:
+                return target, TARGET
+            elif lows[i] <= stop_loss:
+                return stop_loss, STOP_LOSS
+        else:
+            if lows[i] <= target:
+                return target, TARGET
+            elif highs[i] >= stop_loss:
+                return stop_loss, STOP_LOSS
+    return np.nan, NO_EXIT
+
+@njit(cache=True)
+def _scan_meanrev(highs, lows, support, resistance, buffer, midpoint):
+    """
+    Scans the candles after the opening one for a mean reversion entry (short
+    at resistance, long at support, targeting the midpoint) and its exit.
+    Returns (direction, entry, stop_loss, exit_price, reason); direction
+    NO_TRADE if no level was touched, reason NO_EXIT if held to EOD.
+    """
+    direction = NO_TRADE
+    entry = np.nan
+    sl = np.nan
+    target = midpoint
+    for i in range(1, highs.shape[0]):
+        c_high = highs[i]
+        c_low = lows[i]
+        
+        if direction == NO_TRADE:
+            # Check for Entry Triggers
+            # Sell at Resistance
+            if c_high >= resistance:
+                direction = SHORT
+                entry = resistance
+                sl = resistance + buffer
+                # Entered at the level; the same candle may already exit
+                if c_high >= sl:
+                    return direction, entry, sl, sl, STOP_LOSS
+                elif c_low <= target:
+                    return direction, entry, sl, target, TARGET
+            # Buy at Support
+            elif c_low <= support:
+                direction = LONG
+                entry = support
+                sl = support - buffer
+                if c_low <= sl:
+                    return direction, entry, sl, sl, STOP_LOSS
+                elif c_high >= target:
+                    return direction, entry, sl, target, TARGET
+        
+        else:
+            # Manage existing trade
+            if direction == LONG:
+                if c_high >= target:
+                    return direction, entry, sl, target, TARGET
+                elif c_low <= sl:
+                    return direction, entry, sl, sl, STOP_LOSS
+            else:
+                if c_low <= target:
+                    return direction, entry, sl, target, TARGET
+                elif c_high >= sl:
+                    return direction, entry, sl, sl, STOP_LOSS
+    return direction, entry, sl, np.nan, NO_EXIT
+
 def run_backtest(file_path):
     df_5min = load_and_preprocess_data(file_path)
     if df_5min is None:
@@ -136,30 +213,36 @@ def run_backtest(file_path):
     results = []
     trades = []
     
-    # Group the 5min data by date again for easy access
-    df_grouped = df_5min.groupby('date_only')
+    # Row range of each date in the (time-sorted) 5min data, so days are sliced
+    # out of the raw arrays instead of building a DataFrame per day
+    df_5min = df_5min.sort_index()
+    opens = df_5min['open'].to_numpy(dtype=np.float64)
+    highs = df_5min['high'].to_numpy(dtype=np.float64)
+    lows = df_5min['low'].to_numpy(dtype=np.float64)
+    closes = df_5min['close'].to_numpy(dtype=np.float64)
+    dates_arr = df_5min['date_only'].to_numpy()
+    unique_dates, starts = np.unique(dates_arr, return_index=True)
+    ends = np.r_[starts[1:], len(dates_arr)]
+    day_bounds = dict(zip(unique_dates, zip(starts, ends)))
     
     print(f"Analyzing {len(daily_stats)} trading days...")
     
     for date, stats in daily_stats.iterrows():
-        if date not in df_grouped.groups:
+        if date not in day_bounds:
             continue
             
-        day_data = df_grouped.get_group(date)
-        
-        if day_data.empty:
-            continue
+        start, end = day_bounds[date]
+        day_highs = highs[start:end]
+        day_lows = lows[start:end]
             
         # Get Opening Candle (First 5-min candle)
-        opening_candle = day_data.iloc[0]
-        opening_close = opening_candle['close']
-        opening_open = opening_candle['open']
-        opening_high = opening_candle['high']
-        opening_low = opening_candle['low']
+        opening_close = closes[start]
+        opening_open = opens[start]
+        opening_high = highs[start]
+        opening_low = lows[start]
         
         # Get Closing Candle (Last 5-min candle)
-        closing_candle = day_data.iloc[-1]
-        closing_val = closing_candle['close']
+        closing_val = closes[end - 1]
         
         support = stats['support']
         resistance = stats['resistance']
@@ -210,37 +293,16 @@ def run_backtest(file_path):
             pass # Logic handled inside the loop below
             
         if trade_type in ['LONG', 'SHORT']:
-            # Original Breakout Strategy Execution
-            exit_price = None
-            exit_reason = None
-            
-            for i in range(1, len(day_data)):
-                candle = day_data.iloc[i]
-                c_high = candle['high']
-                c_low = candle['low']
-                
-                if trade_type == 'LONG':
-                    if c_high >= target:
-                        exit_price = target
-                        exit_reason = 'TARGET'
-                        break
-                    elif c_low <= stop_loss:
-                        exit_price = stop_loss
-                        exit_reason = 'STOP_LOSS'
-                        break
-                elif trade_type == 'SHORT':
-                    if c_low <= target:
-                        exit_price = target
-                        exit_reason = 'TARGET'
-                        break
-                    elif c_high >= stop_loss:
-                        exit_price = stop_loss
-                        exit_reason = 'STOP_LOSS'
-                        break
+            # Original Breakout Strategy Execution (compiled scan over the day's candles)
+            exit_price, reason = _scan_breakout(
+                day_highs, day_lows,
+                target, stop_loss, LONG if trade_type == 'LONG' else SHORT)
             
-            if exit_price is None:
+            if reason == NO_EXIT:
                 exit_price = closing_val
                 exit_reason = 'EOD'
+            else:
+                exit_reason = EXIT_REASONS[reason]
             
             pnl_points = exit_price - entry_price if trade_type == 'LONG' else entry_price - exit_price
                 
@@ -258,84 +320,21 @@ def run_backtest(file_path):
             })
             
         elif start_close_state == 'Inside':
-            # Mean Reversion Execution
-            mr_trade_type = None
-            mr_entry = None
-            mr_sl = None
-            mr_target = None
-            mr_exit = None
-            mr_reason = None
-            
+            # Mean Reversion Execution (compiled scan over the day's candles)
             midpoint = (stats['prev_day_max'] + stats['prev_day_min']) / 2
+            mr_target = midpoint
             
-            # Iterate through candles to find entry
-            for i in range(1, len(day_data)):
-                candle = day_data.iloc[i]
-                c_high = candle['high']
-                c_low = candle['low']
-                c_close = candle['close']
-                
-                if mr_trade_type is None:
-                    # Check for Entry Triggers
-                    # Sell at Resistance
-                    if c_high >= resistance:
-                        mr_trade_type = 'SHORT'
-                        mr_entry = resistance
-                        mr_sl = resistance + stats['buffer']
-                        mr_target = midpoint
-                        # Check if this same candle hits SL or Target immediately?
-                        # Let's assume we enter at the level.
-                        # If High > SL, we might stop out immediately.
-                        if c_high >= mr_sl:
-                             mr_exit = mr_sl
-                             mr_reason = 'STOP_LOSS'
-                             break
-                        elif c_low <= mr_target:
-                             mr_exit = mr_target
-                             mr_reason = 'TARGET'
-                             break
-                             
-                    # Buy at Support
-                    elif c_low <= support:
-                        mr_trade_type = 'LONG'
-                        mr_entry = support
-                        mr_sl = support - stats['buffer']
-                        mr_target = midpoint
-                        
-                        if c_low <= mr_sl:
-                            mr_exit = mr_sl
-                            mr_reason = 'STOP_LOSS'
-                            break
-                        elif c_high >= mr_target:
-                            mr_exit = mr_target
-                            mr_reason = 'TARGET'
-                            break
-                
-                else:
-                    # Manage existing trade
-                    if mr_trade_type == 'LONG':
-                        if c_high >= mr_target:
-                            mr_exit = mr_target
-                            mr_reason = 'TARGET'
-                            break
-                        elif c_low <= mr_sl:
-                            mr_exit = mr_sl
-                            mr_reason = 'STOP_LOSS'
-                            break
-                    elif mr_trade_type == 'SHORT':
-                        if c_low <= mr_target:
-                            mr_exit = mr_target
-                            mr_reason = 'TARGET'
-                            break
-                        elif c_high >= mr_sl:
-                            mr_exit = mr_sl
-                            mr_reason = 'STOP_LOSS'
-                            break
+            direction, mr_entry, mr_sl, mr_exit, reason = _scan_meanrev(
+                day_highs, day_lows,
+                support, resistance, stats['buffer'], midpoint)
             
-            if mr_trade_type:
-                if mr_exit is None:
+            if direction != NO_TRADE:
+                mr_trade_type = 'LONG' if direction == LONG else 'SHORT'
+                if reason == NO_EXIT:
                     mr_exit = closing_val
                     mr_reason = 'EOD'
+                else:
+                    mr_reason = EXIT_REASONS[reason]
                 
                 pnl = mr_exit - mr_entry if mr_trade_type == 'LONG' else mr_entry - mr_exit
                 
@@ -1,6 +1,5 @@
 import yfinance as yf
 import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 
 def analyze_nifty_today():
@@ -51,10 +50,10 @@ def analyze_nifty_today():
     # Note: yfinance 5m data might have slight differences from Kite, but good for approximation.
     opens = yesterday_df['Open'].values
     closes = yesterday_df['Close'].values
-    all_body_values = np.concatenate([opens, closes])
     
-    prev_day_max = np.max(all_body_values)
-    prev_day_min = np.min(all_body_values)
+    # Reduce each column separately rather than concatenating them first
+    prev_day_max = max(opens.max(), closes.max())
+    prev_day_min = min(opens.min(), closes.min())
     range_height = prev_day_max - prev_day_min
     buffer = range_height * 0.05
     
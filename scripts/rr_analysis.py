@@ -105,7 +105,7 @@ def simulate_trade(day_data, entry_price, sl_price, target_price):
         
     subsequent_candles = day_data.iloc[1:]
     
-    for idx, row in subsequent_candles.iterrows():
+    for low, high in subsequent_candles[['low', 'high']].itertuples(index=False, name=None):
         # Check High for TP and Low for SL
         # Assuming we check both in the same candle, worst case (SL first) or best case?
         # Standard conservative: Check if Low hit SL first? 
@@ -113,9 +113,9 @@ def simulate_trade(day_data, entry_price, sl_price, target_price):
         # But usually, if both are hit in same candle, it's a volatile mess.
         # Let's assume if Low <= SL, we are out.
         
-        if row['low'] <= sl_price:
+        if low <= sl_price:
             return 'SL'
-        if row['high'] >= target_price:
+        if high >= target_price:
             return 'TP'
             
     return 'EOD'
@@ -151,7 +151,7 @@ def run_rr_analysis(file_path):
     
     print(f"Analyzing {len(daily_stats)} trading days for 'Above -> Above' 1:2 R:R setups...")
     
-    for date, stats in daily_stats.iterrows():
+    for date, support, resistance in daily_stats[['support', 'resistance']].itertuples(name=None):
         if date not in df_grouped.groups:
             continue
             
@@ -167,9 +167,6 @@ def run_rr_analysis(file_path):
         closing_candle = day_data.iloc[-1]
         closing_val = closing_candle['close']
         
-        support = stats['support']
-        resistance = stats['resistance']
-        
         start_open_state, _ = classify_day(opening_open, closing_val, support, resistance)
         start_close_state, _ = classify_day(opening_close, closing_val, support, resistance)
         
@@ -0,0 +1,30 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+atr_analysis = pytest.importorskip("atr_analysis")
+
+def test_sl_hits_match_pandas():
+    rng = np.random.default_rng(1)
+    # Days of 1..20 candles (single-candle days never hit)
+    sizes = rng.integers(1, 21, 50)
+    day = np.repeat(np.arange(len(sizes)), sizes)
+    lows = np.round(100 + rng.normal(0, 3, len(day)), 2)
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]])
+    ends = np.append(starts[1:], len(day))
+    entry = lows[starts] + 1.0
+    atr = rng.uniform(0.5, 4, len(sizes))
+    multipliers = np.array([0.5, 1.0, 1.5, 2.0, 2.5, 3.0])
+
+    hits = atr_analysis._sl_hits_nb(lows, starts, ends, entry, atr, multipliers)
+
+    # Reference: the previous groupby version (lowest low after each day's first candle)
+    frame = pd.DataFrame({'day': day, 'low': lows})
+    low_after = frame[frame['day'].duplicated()].groupby('day')['low'].min().reindex(range(len(sizes))).to_numpy()
+    expected = low_after[:, None] <= entry[:, None] - multipliers[None, :] * atr[:, None]
+    np.testing.assert_array_equal(hits, expected)
+    assert not hits[sizes == 1].any()
@@ -0,0 +1,64 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import _data
+
+pytest.importorskip("pyarrow")
+
+def write_csv(path, n_days, edit=None):
+    rng = np.random.default_rng(5)
+    index = pd.DatetimeIndex(np.concatenate(
+        [pd.date_range(d + pd.Timedelta('09:15:00'), periods=375, freq='min')
+         for d in pd.bdate_range('2024-01-01', periods=n_days)]))
+    close = np.round(21000 + np.cumsum(rng.normal(0, 4, len(index))), 2)
+    frame = pd.DataFrame({'date': index.strftime('%Y-%m-%d %H:%M:%S'), 'open': close,
+                          'high': close + 1, 'low': close - 1, 'close': close, 'volume': 0})
+    if edit is not None:
+        frame.loc[edit, 'open'] = 1.0
+    frame.to_csv(path, index=False)
+
+def cached_stats(csv, calls, monkeypatch):
+    build = _data._body_range
+    monkeypatch.setattr(_data, '_body_range', lambda df: calls.append(len(df)) or build(df))
+    df_5min = _data.load_and_preprocess_data(csv)
+    got = _data.calculate_daily_stats(df_5min.copy(), cache_path=csv + '.daily_stats.parquet', source_path=csv)
+    monkeypatch.setattr(_data, '_body_range', build)
+    pd.testing.assert_frame_equal(got, _data.calculate_daily_stats(df_5min.copy()), check_freq=False)
+    return df_5min
+
+def test_prices_stay_float64(tmp_path):
+    csv = str(tmp_path / 'nifty.csv')
+    write_csv(csv, 2)
+    for _ in range(2):  # parsed, then from the minute cache
+        df_5min = _data.load_and_preprocess_data(csv)
+        assert (df_5min[['open', 'high', 'low', 'close']].dtypes == np.float64).all()
+
+def test_daily_cache_follows_the_csv(tmp_path, monkeypatch):
+    csv = str(tmp_path / 'nifty.csv')
+    calls = []
+    write_csv(csv, 10)
+    full = len(cached_stats(csv, calls, monkeypatch))
+    assert calls == [full]
+
+    # Unchanged CSV: nothing rebuilt
+    calls.clear()
+    cached_stats(csv, calls, monkeypatch)
+    assert calls == []
+
+    # Rows appended: only the last cached day onwards is rebuilt
+    calls.clear()
+    write_csv(csv, 12)
+    df_5min = cached_stats(csv, calls, monkeypatch)
+    assert calls == [3 * 75] and len(df_5min) == 12 * 75
+
+    # Corrected past row, then shortened: everything is rebuilt
+    for n_days, edit in [(12, 10), (8, None)]:
+        calls.clear()
+        write_csv(csv, n_days, edit)
+        df_5min = cached_stats(csv, calls, monkeypatch)
+        assert calls == [len(df_5min)]
@@ -0,0 +1,251 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import asyncio
+import contextlib
+import json
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+download_now = pytest.importorskip("download_now")
+import _historical_data
+AimdThrottle = download_now.AimdThrottle
+
+def test_aimd_halves_on_throttling_and_grows_on_success():
+    async def scenario():
+        throttle = AimdThrottle(4)
+        caps = []
+        for status in [429, 503, 429, 429, 200, 200, 200, 200, 200, 200, 200, 200, None]:
+            await throttle.acquire()
+            # Retry-After 0: no pause, only the cap adapts
+            await throttle.release(status, {'Retry-After': '0'})
+            caps.append(throttle.concurrency)
+        return caps, throttle.in_flight
+
+    caps, in_flight = asyncio.run(scenario())
+    assert caps == [2.0, 1.0, 1.0, 1.0, 1.5, 2.0, 2.5, 3.0, 3.5, 4.0, 4.0, 4.0, 4.0]
+    assert in_flight == 0
+
+def test_aimd_caps_requests_in_flight():
+    async def scenario():
+        throttle = AimdThrottle(3)
+        throttle.concurrency = 2.0
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            await throttle.acquire()
+            peak = max(peak, throttle.in_flight)
+            await asyncio.sleep(0.01)
+            await throttle.release(None)
+
+        await asyncio.gather(*(request() for _ in range(10)))
+        return peak, throttle.in_flight
+
+    assert asyncio.run(scenario()) == (2, 0)
+
+@pytest.mark.parametrize("status, headers", [
+    (429, {'Retry-After': '0.2'}),
+    (200, {'X-RateLimit-Remaining': '1', 'Retry-After': '0.2'}),
+])
+def test_aimd_pauses_new_requests(status, headers):
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        throttle = AimdThrottle(3)
+        await throttle.acquire()
+        await throttle.release(status, headers)
+        start = loop.time()
+        await throttle.acquire()
+        await throttle.release(None)
+        return loop.time() - start
+
+    assert asyncio.run(scenario()) >= 0.19
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert download_now.retry_after({'Retry-After': '2.5'}) == 2.5
+    assert 28 < download_now.retry_after({'Retry-After': later}) <= 30
+    assert download_now.retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0.0
+    assert download_now.retry_after({'Retry-After': 'soon'}) == 1.0
+    assert download_now.retry_after({}) == 1.0
+
+def test_aimd_frees_the_slot_on_malformed_headers():
+    async def scenario():
+        throttle = AimdThrottle(3)
+        for status, headers in [(429, {'Retry-After': 'soon'}), (200, {'X-RateLimit-Remaining': 'n/a'})]:
+            await throttle.acquire()
+            await throttle.release(status, headers)
+        return throttle.in_flight
+
+    assert asyncio.run(scenario()) == 0
+
+class FakeResponse:
+    def __init__(self, status, body):
+        self.status = status
+        self.headers = {'Retry-After': '0'}
+        self._body = body
+
+    async def __aenter__(self):
+        if isinstance(self._body, Exception):
+            raise self._body
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self, content_type='application/json'):
+        return json.loads(self._body)
+
+    async def text(self):
+        return self._body
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def get(self, url, params=None):
+        return self.responses.pop(0)
+
+CANDLES_BODY = json.dumps({'status': 'success', 'data': {'candles': [['2024-01-01T09:15:00+0530', 1, 2, 0, 1, 10]]}})
+
+def fetch(responses):
+    async def scenario():
+        session = FakeSession(responses)
+        candles = await download_now.fetch_candles(
+            session, AimdThrottle(3), contextlib.nullcontext(), 1, datetime(2024, 1, 1), datetime(2024, 1, 2))
+        return candles, len(session.responses)
+    return asyncio.run(scenario())
+
+def test_fetch_candles_retries_throttling_and_transport_errors():
+    responses = [
+        FakeResponse(429, '{"message": "Too many requests"}'),
+        FakeResponse(502, '<html>Bad Gateway</html>'),  # not JSON
+        FakeResponse(None, asyncio.TimeoutError()),
+        FakeResponse(200, CANDLES_BODY),
+    ]
+    assert fetch(responses) == ([['2024-01-01T09:15:00+0530', 1, 2, 0, 1, 10]], 0)
+
+@pytest.mark.parametrize("responses, message", [
+    ([FakeResponse(403, '{"message": "Invalid token"}')] * 2, "Invalid token"),
+    ([FakeResponse(503, 'Service Unavailable')] * 4, "HTTP 503"),
+    ([FakeResponse(None, download_now.aiohttp.ClientError("Connection reset"))] * 4, "Connection reset"),
+])
+def test_fetch_candles_raises_the_last_error(responses, message):
+    with pytest.raises(RuntimeError, match=message):
+        fetch(responses)
+
+CREATE_TABLE_SQL = '''
+    CREATE TABLE historical_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        datetime TEXT NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume INTEGER
+    )
+'''
+
+def make_candles(n, start=0, price=100.0):
+    return [[f"2024-01-{1 + (start + k) // 375:02d}T{9 + (15 + (start + k) % 375) // 60:02d}:"
+             f"{(15 + (start + k) % 375) % 60:02d}:00+0530",
+             price + k, price + k + 1.5, price + k - 1.5, price + k + 0.25, 1000 + k]
+            for k in range(n)]
+
+def stored_rows(conn):
+    return conn.execute('SELECT symbol, datetime, open, high, low, close, volume '
+                        'FROM historical_data ORDER BY symbol, datetime').fetchall()
+
+def open_db(indexed):
+    conn = sqlite3.connect(':memory:')
+    conn.execute(CREATE_TABLE_SQL)
+    if indexed:
+        conn.execute(_historical_data.CREATE_INDEX_SQL)
+    return conn
+
+def test_batch_insert_sql_stays_under_parameter_limit():
+    assert download_now.ROWS_PER_INSERT * 7 <= 999
+    assert (download_now.ROWS_PER_INSERT + 1) * 7 > 999
+    for n in (1, 5, download_now.ROWS_PER_INSERT):
+        assert download_now.batch_insert_sql(n).count('?') == 7 * n
+    assert 'OR IGNORE' in download_now.BATCH_INSERT_SQL
+    assert 'OR IGNORE' not in download_now.BULK_INSERT_SQL
+
+@pytest.mark.parametrize("n", [1, 141, 142, 143, 284, 300])
+@pytest.mark.parametrize("bulk", [False, True])
+def test_save_candles_matches_to_sql(n, bulk):
+    candles = make_candles(n)
+    conn = open_db(indexed=not bulk)
+    download_now.save_candles(conn.cursor(), 'INFY', candles, bulk=bulk)
+
+    # Reference: the previous DataFrame.to_sql(method='multi') insert
+    expected = open_db(indexed=False)
+    download_now.candle_frame('INFY', candles).to_sql(
+        'historical_data', expected, if_exists='append', index=False, method='multi', chunksize=500)
+    assert stored_rows(conn) == stored_rows(expected)
+    assert len(stored_rows(conn)) == n
+
+def test_save_candles_replaces_overlapping_range():
+    conn = open_db(indexed=True)
+    cursor = conn.cursor()
+    download_now.save_candles(cursor, 'INFY', make_candles(300))
+    download_now.save_candles(cursor, 'TCS', make_candles(10))
+    download_now.save_candles(cursor, 'INFY', make_candles(200, start=250, price=500.0))
+
+    rows = [row for row in stored_rows(conn) if row[0] == 'INFY']
+    expected = download_now.candle_frame('INFY', make_candles(250) + make_candles(200, start=250, price=500.0))
+    assert rows == [tuple(row) for row in expected.itertuples(index=False)]
+    assert sum(row[0] == 'TCS' for row in stored_rows(conn)) == 10
+
+def test_write_candles_keeps_stored_rows_of_a_failed_symbol():
+    import queue
+
+    conn = open_db(indexed=True)
+    conn.isolation_level = None
+    cursor = conn.cursor()
+    download_now.save_candles(cursor, 'INFY', make_candles(300))
+    before = stored_rows(conn)
+
+    bad = make_candles(300, price=500.0)
+    bad[200][4] = object()  # fails in the second INSERT batch, after the range DELETE
+    write_queue = queue.Queue()
+    for item in [('INFY', bad), ('TCS', make_candles(10)), None]:
+        write_queue.put(item)
+    unsaved = []
+    cursor.execute("BEGIN")
+    download_now.write_candles(cursor, write_queue, unsaved)
+    cursor.execute("COMMIT")
+
+    assert unsaved == ['INFY']
+    assert [row for row in stored_rows(conn) if row[0] == 'INFY'] == before
+    assert sum(row[0] == 'TCS' for row in stored_rows(conn)) == 10
+
+def test_download_symbols_queues_results_in_symbol_order(monkeypatch):
+    import queue
+    import types
+
+    delays = {1: 0.05, 2: 0.0, 3: 0.02, 4: 0.01}
+
+    async def fake_fetch(session, throttle, limiter, token, start_date, end_date):
+        await asyncio.sleep(delays[token])
+        if token == 3:
+            raise RuntimeError("Too many requests")
+        return [] if token == 4 else make_candles(token)
+
+    monkeypatch.setattr(download_now, 'fetch_candles', fake_fetch)
+    monkeypatch.setattr(download_now, 'config', types.SimpleNamespace(kite_api_key='key'))
+    write_queue = queue.Queue()
+    symbols = ['A', 'B', 'MISSING', 'C', 'D']
+    tokens = {'A': 1, 'B': 2, 'C': 3, 'D': 4}
+
+    successful, failed = asyncio.run(download_now.download_symbols(
+        write_queue, symbols, tokens, None, None, 'access'))
+
+    assert (successful, failed) == (2, 3)
+    queued = [write_queue.get_nowait() for _ in range(write_queue.qsize())]
+    assert [(symbol, len(candles)) for symbol, candles in queued] == [('A', 1), ('B', 2)]
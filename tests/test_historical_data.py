@@ -0,0 +1,67 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import sqlite3
+
+import pytest
+
+import _historical_data as hd
+
+TABLE_SQL = '''
+    CREATE TABLE historical_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        symbol TEXT NOT NULL,
+        datetime TEXT NOT NULL,
+        close REAL{}
+    )
+'''
+
+def open_db(rows=(), indexed=False, inline_unique=False):
+    conn = sqlite3.connect(':memory:', isolation_level=None)
+    conn.execute(TABLE_SQL.format(',\n        UNIQUE(symbol, datetime)' if inline_unique else ''))
+    conn.executemany('INSERT INTO historical_data (symbol, datetime, close) VALUES (?, ?, ?)', rows)
+    if indexed:
+        conn.execute(hd.CREATE_INDEX_SQL)
+    return conn
+
+def index_names(conn):
+    return [idx[1] for idx in conn.execute("PRAGMA index_list(historical_data)")]
+
+ROWS = [('INFY', '2024-01-01 09:15:00', 1.0), ('INFY', '2024-01-01 09:16:00', 2.0)]
+
+def test_empty_table_is_bulk_loaded_and_indexed_at_the_end():
+    conn = open_db(indexed=True)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    assert hd.prepare_load(cursor)
+    assert index_names(conn) == []
+    hd.finish_load(cursor, True)
+    cursor.execute("COMMIT")
+    assert index_names(conn) == ['idx_sym_dt']
+
+def test_interrupted_bulk_load_keeps_the_index():
+    conn = open_db(indexed=True)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    hd.prepare_load(cursor)
+    cursor.executemany('INSERT INTO historical_data (symbol, datetime, close) VALUES (?, ?, ?)', ROWS * 2)
+    cursor.execute("ROLLBACK")
+    assert index_names(conn) == ['idx_sym_dt']
+    assert conn.execute("SELECT COUNT(*) FROM historical_data").fetchone() == (0,)
+
+def test_unindexed_rows_are_deduped_and_indexed():
+    # Left by a load that ran before the index was built in its transaction
+    conn = open_db(rows=ROWS + [('INFY', '2024-01-01 09:15:00', 3.0)])
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    assert not hd.prepare_load(cursor)
+    cursor.execute("COMMIT")
+    assert index_names(conn) == ['idx_sym_dt']
+    assert conn.execute("SELECT symbol, datetime, close FROM historical_data ORDER BY datetime").fetchall() == [
+        ('INFY', '2024-01-01 09:15:00', 3.0), ('INFY', '2024-01-01 09:16:00', 2.0)]
+
+@pytest.mark.parametrize("rows", [(), ROWS])
+def test_inline_unique_tables_are_never_bulk_loaded(rows):
+    conn = open_db(rows=rows, inline_unique=True)
+    assert not hd.prepare_load(conn.cursor())
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_lab')))
+
+import copy
+
+from _html_fragments import format_dates, format_vix, precompute_html
+
+VIX = {'min': 11.2, 'max': 19.8, 'median': 14.1, 'avg': 14.6}
+
+def make_stats():
+    return {
+        'row1': {'count': 3, 'prob': 50.0, 'dates': ['2024-01-01', '2024-01-02'], 'vix': VIX},
+        'row5': {'count': 1, 'prob': 10.0, 'dates': [], 'vix': None},
+        'closing': {
+            'breakdown': {
+                'up': {'count': 2, 'dates': ['2024-02-01'],
+                       'buckets': {'0-10%': {'count': 1, 'vix': VIX}}},
+            },
+        },
+        'global_stats': {'inside_prob': 61.2},
+    }
+
+def test_precompute_html_matches_formatters():
+    stats = make_stats()
+    out = precompute_html(stats)
+
+    assert out['row1']['_dates_html'] == '2024-01-01<br>2024-01-02'
+    assert out['row1']['_vix_html'] == format_vix(VIX)
+    assert out['row5']['_dates_html'] == ''
+    assert out['row5']['_vix_html'] == 'N/A'
+    up = out['closing']['breakdown']['up']
+    assert up['_dates_html'] == format_dates(['2024-02-01'])
+    assert up['_vix_html'] == 'N/A'
+    bucket = up['buckets']['0-10%']
+    assert bucket['_dates_html'] == '' and bucket['_vix_html'] == format_vix(VIX)
+    # Nodes without dates/vix get nothing attached
+    assert '_dates_html' not in out['global_stats'] and '_dates_html' not in out['closing']
+
+def test_precompute_html_leaves_input_unchanged():
+    stats = make_stats()
+    before = copy.deepcopy(stats)
+    precompute_html(stats)
+    assert stats == before
@@ -0,0 +1,54 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_lab')))
+
+import random
+
+from _html_updates import apply_edits, apply_updates, read_html
+
+def apply_edits_sequential(html, edits):
+    """Reference: one str.replace per edit, as the updater scripts used to do."""
+    for old, new, once in edits:
+        html = html.replace(old, new, 1) if once else html.replace(old, new)
+    return html
+
+def test_matches_sequential_replace():
+    rng = random.Random(0)
+    markers = ['<td>15.60</td>', '<td>15.36</td>', '<td class="date-example">2024-01-0',
+               '<strong>86.8%</strong>', '(512 days)']
+    filler = ['<tr>', '</tr>\n', '<td>x</td>', ' ', 'abc']
+    for _ in range(200):
+        html = ''.join(rng.choice(markers + filler * 2) for _ in range(40))
+        edits = [(old, f'[{i}]', rng.random() < 0.5) for i, old in enumerate(markers) if rng.random() < 0.8]
+        assert apply_edits(html, edits) == apply_edits_sequential(html, edits)
+
+def test_once_replaces_first_match_only():
+    html = '<td>15.60</td><td>15.60</td>'
+    assert apply_edits(html, [('<td>15.60</td>', '<td>16</td>', True)]) == '<td>16</td><td>15.60</td>'
+    assert apply_edits(html, [('<td>15.60</td>', '<td>16</td>', False)]) == '<td>16</td><td>16</td>'
+
+def test_longest_literal_wins_over_its_prefix():
+    html = '<td>row</td><td>2024-01-01</td> <td>row</td><td>other</td>'
+    edits = [('<td>row</td>', '<td>ROW</td>', False),
+             ('<td>row</td><td>2024-01-01', '<td>ROW</td><td>2024-01-01<br>2024-01-02', False)]
+    assert apply_edits(html, edits) == '<td>ROW</td><td>2024-01-01<br>2024-01-02</td> <td>ROW</td><td>other</td>'
+
+def test_replacements_are_not_rescanned():
+    # A sequential replace would turn a into c; one pass only rewrites the original text
+    assert apply_edits('a b', [('a', 'b', False), ('b', 'c', False)]) == 'b c'
+
+def test_first_edit_for_a_literal_wins_and_missing_literals_are_skipped():
+    html = '<td>1</td>'
+    assert apply_edits(html, [('<td>1</td>', 'A', False), ('<td>1</td>', 'B', False)]) == 'A'
+    assert apply_edits(html, [('<td>2</td>', 'B', False)]) is html
+
+def test_apply_updates_rewrites_file(tmp_path):
+    path = tmp_path / 'table.html'
+    path.write_bytes('<td>≥10%</td><td>15.60</td>'.encode('utf-8'))
+    apply_updates(str(path), [[('<td>15.60</td>', '<td>16.1</td>', True)]], [str.upper])
+    assert read_html(str(path)) == '<TD>≥10%</TD><TD>16.1</TD>'
+
+def test_read_html_empty_file(tmp_path):
+    path = tmp_path / 'empty.html'
+    path.write_bytes(b'')
+    assert read_html(str(path)) == ''
@@ -0,0 +1,110 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+nb = pytest.importorskip("nifty_backtest")
+
+# Reference scans: the per-candle loops run_backtest used before the numba kernels
+
+def scan_breakout(highs, lows, target, stop_loss, direction):
+    for i in range(1, len(highs)):
+        if direction == nb.LONG:
+            if highs[i] >= target:
+                return target, nb.TARGET
+            elif lows[i] <= stop_loss:
+                return stop_loss, nb.STOP_LOSS
+        else:
+            if lows[i] <= target:
+                return target, nb.TARGET
+            elif highs[i] >= stop_loss:
+                return stop_loss, nb.STOP_LOSS
+    return np.nan, nb.NO_EXIT
+
+def scan_meanrev(highs, lows, support, resistance, buffer, midpoint):
+    trade = None
+    entry = sl = np.nan
+    for i in range(1, len(highs)):
+        c_high, c_low = highs[i], lows[i]
+        if trade is None:
+            if c_high >= resistance:
+                trade, entry, sl = nb.SHORT, resistance, resistance + buffer
+                if c_high >= sl:
+                    return trade, entry, sl, sl, nb.STOP_LOSS
+                elif c_low <= midpoint:
+                    return trade, entry, sl, midpoint, nb.TARGET
+            elif c_low <= support:
+                trade, entry, sl = nb.LONG, support, support - buffer
+                if c_low <= sl:
+                    return trade, entry, sl, sl, nb.STOP_LOSS
+                elif c_high >= midpoint:
+                    return trade, entry, sl, midpoint, nb.TARGET
+        elif trade == nb.LONG:
+            if c_high >= midpoint:
+                return trade, entry, sl, midpoint, nb.TARGET
+            elif c_low <= sl:
+                return trade, entry, sl, sl, nb.STOP_LOSS
+        else:
+            if c_low <= midpoint:
+                return trade, entry, sl, midpoint, nb.TARGET
+            elif c_high >= sl:
+                return trade, entry, sl, sl, nb.STOP_LOSS
+    return (nb.NO_TRADE if trade is None else trade), entry, sl, np.nan, nb.NO_EXIT
+
+def random_day(rng, n):
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return close + rng.uniform(0, 1, n), close - rng.uniform(0, 1, n)
+
+def test_scan_breakout_matches_loop():
+    rng = np.random.default_rng(2)
+    for _ in range(300):
+        highs, lows = random_day(rng, int(rng.integers(1, 40)))
+        direction = nb.LONG if rng.random() < 0.5 else nb.SHORT
+        sign = 1 if direction == nb.LONG else -1
+        target = 100 + sign * rng.uniform(0, 6)
+        stop_loss = 100 - sign * rng.uniform(0, 6)
+        got = nb._scan_breakout(highs, lows, target, stop_loss, direction)
+        np.testing.assert_equal(tuple(got), scan_breakout(highs, lows, target, stop_loss, direction))
+
+def test_scan_meanrev_matches_loop():
+    rng = np.random.default_rng(3)
+    for _ in range(300):
+        highs, lows = random_day(rng, int(rng.integers(1, 40)))
+        support, resistance = 100 - rng.uniform(0, 5), 100 + rng.uniform(0, 5)
+        buffer = rng.uniform(0, 2)
+        args = (highs, lows, support, resistance, buffer, (support + resistance) / 2)
+        np.testing.assert_equal(tuple(nb._scan_meanrev(*args)), scan_meanrev(*args))
+
+def test_run_backtest_matches_loop(tmp_path, monkeypatch):
+    # Minute bars over a month of sessions, written like the NIFTY export
+    rng = np.random.default_rng(4)
+    days = pd.bdate_range('2024-01-01', periods=25)
+    index = pd.DatetimeIndex(np.concatenate(
+        [pd.date_range(d + pd.Timedelta('09:15:00'), periods=375, freq='min') for d in days]))
+    close = 21000 + np.cumsum(rng.normal(0, 4, len(index)))
+    open_ = np.r_[close[0], close[:-1]]
+    frame = pd.DataFrame({
+        'date': index.strftime('%Y-%m-%d %H:%M:%S'),
+        'open': open_.round(2),
+        'high': (np.maximum(open_, close) + rng.uniform(0, 3, len(index))).round(2),
+        'low': (np.minimum(open_, close) - rng.uniform(0, 3, len(index))).round(2),
+        'close': close.round(2),
+        'volume': 0,
+    })
+    csv = tmp_path / 'nifty.csv'
+    frame.to_csv(csv, index=False)
+    monkeypatch.chdir(tmp_path)
+
+    def run():
+        nb.run_backtest(str(csv))
+        with open('results.txt') as f:
+            return f.read()
+
+    compiled = run()
+    monkeypatch.setattr(nb, '_scan_breakout', scan_breakout)
+    monkeypatch.setattr(nb, '_scan_meanrev', scan_meanrev)
+    assert compiled == run()
+    assert 'Total Trades' in compiled
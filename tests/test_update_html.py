@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_lab')))
+
+import gzip
+import json
+
+import pytest
+
+import update_html
+
+@pytest.fixture
+def outputs(tmp_path, monkeypatch):
+    """Point update_html at a temp stats file/outputs; returns (paths, render calls)."""
+    stats_path = tmp_path / 'stats.json'
+    stats_path.write_text(json.dumps({'row1': {'count': 1}}))
+    paths = {name: str(tmp_path / f'{name}.html') for name in update_html.OUTPUT_PATHS}
+    calls = []
+
+    def renderer(name):
+        def render(stats, out):
+            calls.append(name)
+            out.write(f'{name} {stats["row1"]["count"]}'.encode('utf-8'))
+        return render
+
+    monkeypatch.setattr(update_html, 'STATS_PATH', str(stats_path))
+    monkeypatch.setattr(update_html, 'OUTPUT_PATHS', paths)
+    monkeypatch.setattr(update_html, 'RENDERERS', {name: renderer(name) for name in paths})
+    return paths, calls, stats_path
+
+def test_unchanged_inputs_skip_rendering(outputs):
+    paths, calls, _ = outputs
+    update_html.main()
+    assert sorted(calls) == ['detailed', 'full']
+    calls.clear()
+    update_html.main()
+    assert calls == []
+    update_html.main(force=True)
+    assert sorted(calls) == ['detailed', 'full']
+
+def test_changed_stats_regenerates(outputs):
+    paths, calls, stats_path = outputs
+    update_html.main()
+    calls.clear()
+    update_html.load_stats.cache_clear()
+    stats_path.write_text(json.dumps({'row1': {'count': 2}}))
+    update_html.main()
+    assert sorted(calls) == ['detailed', 'full']
+    with open(paths['full'], 'rb') as f:
+        assert f.read() == b'full 2'
+
+def test_deleted_or_patched_output_regenerates(outputs):
+    paths, calls, _ = outputs
+    update_html.main()
+    calls.clear()
+    os.remove(paths['full'])
+    with open(paths['detailed'], 'ab') as f:
+        f.write(b' patched')
+    update_html.main()
+    assert sorted(calls) == ['detailed', 'full']
+    with open(paths['detailed'], 'rb') as f:
+        assert f.read() == b'detailed 1'
+
+def test_old_sidecar_format_regenerates(outputs):
+    paths, calls, _ = outputs
+    update_html.main('full')
+    with open(paths['full'] + '.hash', 'w') as f:
+        f.write('0' * 32)
+    calls.clear()
+    update_html.main('full')
+    assert calls == ['full']
+
+def test_gzip_copy_matches_output(outputs):
+    paths, calls, _ = outputs
+    update_html.main('full', compress=True)
+    assert calls == ['full']
+    with gzip.open(paths['full'] + '.gz', 'rb') as f:
+        assert f.read() == b'full 1'
+
+def test_gzip_written_on_cache_hit(outputs):
+    paths, calls, _ = outputs
+    update_html.main('full')
+    calls.clear()
+    update_html.main('full', compress=True)
+    assert calls == []
+    with gzip.open(paths['full'] + '.gz', 'rb') as f:
+        assert f.read() == b'full 1'
@@ -0,0 +1,94 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_lab')))
+
+import json
+
+import pytest
+
+import update_html_all
+import update_html_split
+import update_html_with_corrected_data as corrected
+import update_vix_timing
+from _html_updates import apply_updates, read_html
+
+INDENT = '\n                    '
+
+def corrected_row(label, prob_class, prob, count):
+    return f'<td>{label}</td>{INDENT}<td class="{prob_class}"><strong>{prob}%</strong><br><strong>({count} days)</strong></td>'
+
+# Rows 1-4 as they are before update_html_with_corrected_data.py; the
+# [pending calc] cells are only matched by update_vix_timing.py once the
+# corrected probabilities are in
+TABLE = (
+    '<table>\n'
+    '<tr><td>touched prev day high; before touching prev day low</td></tr>\n'
+    '<!-- STAYED INSIDE -->\n'
+    + ''.join(
+        f'<tr>{corrected_row(label, prob_class, prob, count)}{INDENT}<td>[pending calc]</td>{INDENT}<td>{vix}</td></tr>\n'
+        for label, prob_class, prob, count, vix in [
+            ('touches prev day low without going ≥10% (of prev range) over prev high', 'prob-high', 86.8, 512, 15.59),
+            ('goes ≥10% (of prev range) above prev high', 'prob-low', 13.2, 78, 15.78),
+            ('touches prev day high without going ≥10% (of prev range) below prev low', 'prob-high', 92.3, 619, 15.31),
+        ])
+    # Row 4's probability cell is indented one space less in the original table
+    + f'<tr>{corrected_row("goes ≥10% (of prev range) below prev low", "prob-low", 7.7, 52).replace(INDENT, INDENT[:-1])}'
+    f'{INDENT}<td>[pending calc]</td>{INDENT}<td>16.22</td></tr>\n'
+    '</table>\n'
+)
+
+@pytest.fixture
+def table(tmp_path, monkeypatch):
+    def row(count, probability):
+        return {'count': count, 'probability': probability, 'vix': 15.0, 'dates': ['2023-05-01']}
+
+    vix = {'min': 10.1, 'max': 30.2, 'median': 14.3, 'avg': 15.4}
+    timing = {'min': 5, 'min_date': '2023-01-02', 'max': 300, 'max_date': '2023-02-03',
+              'median': 40, 'median_date': '2023-03-04', 'avg': 60}
+    split_row = {'count': 3, 'prob': 1.5, 'timing': None, 'vix': vix, 'dates': ['2023-05-01']}
+    files = {
+        'corrected': {
+            'row1_stayed_within_10pct_above': row(529, 89.7), 'row2_went_10pct_above': row(61, 10.3),
+            'row3_stayed_within_10pct_below': row(597, 89.0), 'row4_went_10pct_below': row(74, 11.0),
+            'row5_stayed_inside': {**row(120, 18.5), 'avg_pct_range': 0.8, 'avg_gap_from_high': 0.3,
+                                   'avg_gap_from_low': 0.4},
+        },
+        'vix_timing': {
+            'row1_stayed_within_10pct_above': {'vix_stats': vix},
+            'row2_went_10pct_above': {'vix_stats': vix, 'timing_stats': timing},
+            'row3_stayed_within_10pct_below': {'vix_stats': vix},
+            'row4_went_10pct_below': {'vix_stats': vix, 'timing_stats': timing},
+            'row5_stayed_inside': {'vix_stats': vix},
+        },
+        'split': {name: split_row for name in
+                  ['row1', 'row2_direct', 'row2_retraced', 'row3', 'row4_direct', 'row4_retraced']},
+    }
+    for name, data in files.items():
+        (tmp_path / f'{name}.json').write_text(json.dumps(data))
+    monkeypatch.setattr(corrected, 'CORRECTED_DATA_PATH', str(tmp_path / 'corrected.json'))
+    monkeypatch.setattr(update_vix_timing, 'VIX_TIMING_STATS_PATH', str(tmp_path / 'vix_timing.json'))
+    monkeypatch.setattr(update_html_split, 'STATS_PATH', str(tmp_path / 'split.json'))
+
+    path = tmp_path / 'MASTER_TRADING_TABLE.html'
+    path.write_bytes(TABLE.encode('utf-8'))
+    monkeypatch.setattr(update_html_all, 'HTML_PATH', str(path))
+    return path
+
+# What each script's __main__ does to the file
+SCRIPTS = {
+    'corrected': lambda path: apply_updates(path, [corrected.build_edits()]),
+    'vix_timing': lambda path: apply_updates(path, [update_vix_timing.build_edits()]),
+    'split': lambda path: apply_updates(path, [], transforms=[update_html_split.split_rows]),
+}
+
+@pytest.mark.parametrize("names", [['corrected', 'vix_timing'], list(update_html_all.UPDATERS)])
+def test_combined_run_matches_running_the_scripts_in_order(table, names):
+    for name in names:
+        SCRIPTS[name](str(table))
+    expected = read_html(str(table))
+
+    table.write_bytes(TABLE.encode('utf-8'))
+    update_html_all.main(names)
+    assert read_html(str(table)) == expected
+    # The vix_timing markers only exist after the corrected-data edits
+    assert '[pending calc]' not in expected
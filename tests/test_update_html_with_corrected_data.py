@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'research_lab')))
+
+import json
+
+import pytest
+
+import update_html_with_corrected_data as corrected
+from _html_updates import apply_edits
+
+ROW5_OLD = ('<td colspan="2">stayed within prev day range<br>(neither high nor low touched)</td>\n'
+            '                    <td colspan="2" class="prob-low"><strong>16.3%</strong><br><strong>(245 days)</strong></td>\n'
+            '                    <td colspan="2">No further moves</td>\n'
+            '                    <td colspan="2" class="date-example">')
+ROW5_NEW = ('<td colspan="2">stayed within prev day range<br>(neither high nor low touched)</td>\n'
+            '                    <td colspan="2" class="prob-low"><strong>18.5%</strong><br><strong>(120 days)</strong></td>\n'
+            '                    <td colspan="2">Avg % range: 0.8%<br>Gap from high: 0.3%<br>Gap from low: 0.4%</td>\n'
+            '                    <td class="date-example">VIX: 14.2</td>\n'
+            '                    <td class="date-example">')
+DATES = ['2024-01-02', '2024-01-03', '2024-01-04']
+DATES_HTML = '<br>'.join(DATES)
+
+@pytest.fixture
+def edits(tmp_path, monkeypatch):
+    row = {'count': 7, 'probability': 1.0, 'vix': 15.0, 'dates': ['2023-05-01']}
+    data = {
+        'row1_stayed_within_10pct_above': row, 'row2_went_10pct_above': row,
+        'row3_stayed_within_10pct_below': row, 'row4_went_10pct_below': row,
+        'row5_stayed_inside': {'count': 120, 'probability': 18.5, 'vix': 14.2, 'dates': DATES,
+                               'avg_pct_range': 0.8, 'avg_gap_from_high': 0.3, 'avg_gap_from_low': 0.4},
+    }
+    path = tmp_path / 'corrected_data.json'
+    path.write_text(json.dumps(data))
+    monkeypatch.setattr(corrected, 'CORRECTED_DATA_PATH', str(path))
+    return corrected.build_edits()
+
+def test_row5_truncated_dates_are_expanded(edits):
+    html = f'<tr>{ROW5_OLD}{DATES_HTML[:20]}</td></tr>'
+    assert apply_edits(html, edits) == f'<tr>{ROW5_NEW}{DATES_HTML}</td></tr>'
+
+def test_row5_other_dates_are_kept(edits):
+    html = f'<tr>{ROW5_OLD}2019-03-04</td></tr>'
+    assert apply_edits(html, edits) == f'<tr>{ROW5_NEW}2019-03-04</td></tr>'
+
+def test_rerun_leaves_row5_unchanged(edits):
+    html = apply_edits(f'<tr>{ROW5_OLD}{DATES_HTML[:20]}</td></tr>', edits)
+    assert apply_edits(html, edits) == html
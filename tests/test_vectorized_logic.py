@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+vl = pytest.importorskip("research_lab.vectorized_logic")
+
+def make_bars(n=600, seed=0):
+    """5-min bars over several days; prices on a 0.25 grid so ties occur."""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2024-01-01 09:15', periods=n, freq='5min')
+    close = pd.Series(100 + np.round(np.cumsum(rng.normal(0, 1, n)) * 4) / 4, index=index)
+    high = close + np.round(rng.uniform(0, 2, n) * 4) / 4
+    low = close - np.round(rng.uniform(0, 2, n) * 4) / 4
+    volume = pd.Series(rng.integers(1, 5000, n).astype(np.float64), index=index)
+    return high, low, close, volume
+
+@pytest.mark.parametrize("with_nans", [False, True])
+@pytest.mark.parametrize("window", [1, 3, 10, 15])
+def test_breakout_signals_match_rolling(window, with_nans):
+    high, low, close, _ = make_bars()
+    if with_nans:
+        # Gaps of one and several bars, in high and low separately and together
+        high.iloc[[40, 41, 42, 200, 350, 351, 598]] = np.nan
+        low.iloc[[41, 120, 121, 350, 500]] = np.nan
+        close.iloc[[60, 120]] = np.nan
+    entries, exits = vl.structure_shift_signals(high, low, close, lookback=window)
+    # Reference: the previous pandas implementation
+    pd.testing.assert_series_equal(entries, close > high.rolling(window).max().shift(1), check_names=False)
+    pd.testing.assert_series_equal(exits, close < low.rolling(window).min().shift(1), check_names=False)
+
+def test_vwap_resets_each_session():
+    high, low, close, volume = make_bars()
+    session = vl._session_ids(close.index, 'D')
+    vwap = vl._vwap_nb(high.to_numpy(), low.to_numpy(), close.to_numpy(), volume.to_numpy(), session)
+
+    day = close.index.normalize()
+    tp_v = (high + low + close) / 3 * volume
+    expected = tp_v.groupby(day).cumsum() / volume.groupby(day).cumsum()
+    np.testing.assert_allclose(vwap, expected.to_numpy(), rtol=1e-12)
+    assert len(np.unique(session)) > 1
+
+def test_vwap_unanchored_is_running_vwap():
+    high, low, close, volume = make_bars()
+    session = vl._session_ids(close.index, None)
+    vwap = vl._vwap_nb(high.to_numpy(), low.to_numpy(), close.to_numpy(), volume.to_numpy(), session)
+    expected = ((high + low + close) / 3 * volume).cumsum() / volume.cumsum()
+    np.testing.assert_allclose(vwap, expected.to_numpy(), rtol=1e-12)
+
+def test_cached_builds_once_per_input_and_params():
+    cache = type(vl._MA_CACHE)()
+    builds = []
+
+    def build(series, window):
+        builds.append(window)
+        return series.rolling(window).mean()
+
+    close = pd.Series(np.arange(50.0))
+    copy = close.copy()
+    first = vl._cached(cache, close, (5,), lambda: build(close, 5))
+    assert vl._cached(cache, close, (5,), lambda: build(close, 5)) is first
+    vl._cached(cache, close, (10,), lambda: build(close, 10))
+    # Equal values in another Series are a different input
+    vl._cached(cache, copy, (5,), lambda: build(copy, 5))
+    assert builds == [5, 10, 5]
+
+
+def test_indicator_cache_hits_and_releases_inputs():
+    import gc
+    vl.clear_indicator_cache()
+    _, _, close, _ = make_bars()
+    ema = vl._ema(close, 9)
+    assert vl._ema(close, 9) is ema
+    pd.testing.assert_series_equal(ema, close.ewm(span=9, min_periods=9, adjust=False).mean())
+    assert len(vl._MA_CACHE) == 1
+    # Entries only hold the input weakly and go away with it
+    del close
+    gc.collect()
+    assert len(vl._MA_CACHE) == 0
+
+def test_indicator_cache_is_bounded():
+    vl.clear_indicator_cache()
+    inputs = [pd.Series(np.arange(30.0)) for _ in range(vl._CACHE_SIZE + 10)]
+    for close in inputs:
+        vl._ema(close, 3)
+    assert len(vl._MA_CACHE) == vl._CACHE_SIZE
+    vl.clear_indicator_cache()
+    assert len(vl._MA_CACHE) == 0
@@ -0,0 +1,32 @@
+"""
+Thread-safe request pacing for the Kite API
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Space calls at least 1/rate seconds apart across all threads
+
+    Each wait() reserves the next free slot under the lock and sleeps outside
+    it, so any number of workers together stay within `rate` requests/second.
+    """
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Maximum requests per second
+        """
+        self.interval = 1.0 / rate
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller may send its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(slot - now)